@@ -0,0 +1,259 @@
+"""End to end throughput of :func:`ingest` against the local stub API.
+
+Run from the repository root with ``python -m benchmarks.bench_ingest``, see
+``--help`` for the options. Every scenario runs in a fresh interpreter so
+its peak RSS is not inflated by earlier scenarios, while the stub API runs
+in this process. Each scenario is measured twice:
+
+* without instrumentation, for pages/s and records/s;
+* with a :class:`PageEvent` subscriber, to split the wall time into the HTTP
+  round trips, decoding and the time spent in each hook. The per-page
+  overhead is the wall time not spent waiting for responses.
+
+The results are written as JSON, to compare runs between versions.
+"""
+
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import requests
+
+from benchmarks.stub_api import PAGING_STYLES, StubAPI, StubConfig
+from src.inquestor.inquestor import ingest
+
+RECORD_PATH = "data.items[*]"
+MODES = ("pages", "records", "stream")
+
+
+def paging_hook(paging: str, limit: int, total: int):
+    """Returns the ``next_page`` hook and the initial params of a style.
+
+    The offset and page styles know the total up front, like APIs that
+    return a count, so their hooks do not need the response.
+    """
+    if paging == "page":
+
+        def next_page(keyword_arg_dict=None, response=None):
+            if keyword_arg_dict is None:
+                return {"params": {"page": 1}}
+            page = keyword_arg_dict["params"]["page"]
+            return page * limit < total and {"params": {"page": page + 1}}
+
+        return next_page, {"per_page": limit}
+    if paging == "cursor":
+
+        def next_page(keyword_arg_dict=None, response=None):
+            if keyword_arg_dict is None:
+                return {"params": {"cursor": ""}}
+            cursor = response.json()["data"]["next"]
+            return cursor and {"params": {"cursor": cursor}}
+
+        return next_page, {"limit": limit}
+    if paging == "link":
+
+        def next_page(keyword_arg_dict=None, response=None):
+            if keyword_arg_dict is None:
+                return {"params": {"offset": 0}}
+            link = response.links.get("next")
+            return link and {"url": link["url"], "params": None}
+
+        return next_page, {"limit": limit}
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"params": {"offset": 0}}
+        offset = keyword_arg_dict["params"]["offset"] + limit
+        return offset < total and {"params": {"offset": offset}}
+
+    return next_page, {"limit": limit}
+
+
+def run_ingest(scenario, instrument=None) -> tuple[float, int, int]:
+    """Runs one ingest of the scenario.
+
+    :return: Wall time, pages and records.
+    """
+    paging_next_page, params = paging_hook(
+        scenario["paging"], scenario["limit"], scenario["total"]
+    )
+    calls = 0
+
+    def next_page(keyword_arg_dict=None, response=None):
+        nonlocal calls
+        calls += 1
+        return paging_next_page(keyword_arg_dict, response)
+
+    mode = scenario["mode"]
+    start = time.perf_counter()
+    data = ingest(
+        "GET",
+        scenario["url"],
+        params=params,
+        next_page=next_page,
+        prefetch=scenario["prefetch"],
+        records=None if mode == "pages" else RECORD_PATH,
+        stream=mode == "stream",
+        instrument=instrument,
+    )
+    if mode == "pages":
+        records = sum(len(page["data"]["items"]) for page in data)
+    else:
+        records = sum(1 for _record in data)
+    # next_page is called once more than there are pages.
+    return time.perf_counter() - start, calls - 1, records
+
+
+def run_scenario(scenario) -> dict:
+    """Measures one scenario, in the worker interpreter."""
+    plain = []
+    for _repeat in range(scenario["repeat"]):
+        elapsed, pages, records = run_ingest(scenario)
+        plain.append(elapsed)
+    elapsed = statistics.median(plain)
+
+    latency = decode = 0.0
+    hooks = Counter()
+
+    def collect(event):
+        nonlocal latency, decode
+        latency += event.latency
+        decode += event.decode
+        hooks.update(event.hooks)
+
+    instrumented, pages, records = run_ingest(scenario, instrument=collect)
+    return scenario | {
+        "pages": pages,
+        "records": records,
+        "seconds": elapsed,
+        "seconds_all": plain,
+        "pages_per_second": pages / elapsed,
+        "records_per_second": records / elapsed,
+        # Prefetched requests overlap, so their latencies do not add up.
+        "overhead_us_per_page": None
+        if scenario["prefetch"]
+        else (instrumented - latency) / pages * 1e6,
+        "latency_us_per_page": latency / pages * 1e6,
+        "decode_us_per_page": decode / pages * 1e6,
+        "hook_us_per_page": {
+            hook: seconds / pages * 1e6 for hook, seconds in sorted(hooks.items())
+        },
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def scenarios(args):
+    for paging in args.paging:
+        for prefetch in args.prefetch:
+            # Prefetching requires next_page to ignore the response.
+            if prefetch and paging != "offset":
+                continue
+            for mode in args.mode:
+                # The cursor is in the body, which streaming has consumed.
+                if mode == "stream" and paging == "cursor":
+                    continue
+                yield {
+                    "paging": paging,
+                    "prefetch": prefetch,
+                    "mode": mode,
+                    "limit": args.limit,
+                    "total": args.total,
+                    "repeat": args.repeat,
+                }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--total", type=int, default=10_000, help="records served")
+    parser.add_argument("--limit", type=int, default=100, help="records per page")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds/request")
+    parser.add_argument("--record-size", type=int, default=100, help="bytes/record")
+    parser.add_argument(
+        "--paging", nargs="+", choices=PAGING_STYLES, default=list(PAGING_STYLES)
+    )
+    parser.add_argument("--prefetch", nargs="+", type=int, default=[0, 4])
+    parser.add_argument("--mode", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario")
+    parser.add_argument("--output", help="JSON file to write, default stdout")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.worker:
+        print(json.dumps(run_scenario(json.loads(args.worker))))
+        return
+
+    results = []
+    for paging in args.paging:
+        config = StubConfig(
+            total=args.total,
+            latency=args.latency,
+            record_size=args.record_size,
+            paging=paging,
+        )
+        with StubAPI(config) as api:
+            for scenario in scenarios(args):
+                if scenario["paging"] != paging:
+                    continue
+                scenario["url"] = api.url
+                worker = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_ingest"]
+                    + ["--worker", json.dumps(scenario)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                result = json.loads(worker.stdout)
+                del result["url"]
+                results.append(result)
+                print(
+                    f"{paging:>7} prefetch={scenario['prefetch']} "
+                    f"{scenario['mode']:>7}: {result['pages_per_second']:>9.1f} pages/s "
+                    f"{result['records_per_second']:>11.1f} records/s "
+                    f"{result['decode_us_per_page']:>8.1f} us/page decode",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": requests.__version__,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "config": {
+            "total": args.total,
+            "limit": args.limit,
+            "latency": args.latency,
+            "record_size": args.record_size,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
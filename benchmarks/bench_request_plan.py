@@ -0,0 +1,64 @@
+"""Per-page argument merging overhead of :class:`RequestPlan`.
+
+Run from the repository root with ``python -m benchmarks.bench_request_plan``.
+The per-page cost should stay flat as the number of pages grows.
+"""
+
+import time
+
+from src.inquestor.inquestor import (
+    RequestInput,
+    RequestPlan,
+    update_args,
+    validate_keys,
+)
+
+
+def request_input_args():
+    args = {key: None for key in RequestInput.__members__}
+    args |= {"method": "GET", "url": "https://api.test", "params": {"limit": 100}}
+    return args
+
+
+def next_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"offset": 0}}
+    return {"params": {"offset": keyword_arg_dict["params"]["offset"] + 100}}
+
+
+def authenticate(reauth_dict=None, response=None):
+    return {"headers": {"Authorization": "Bearer token"}}, reauth_dict
+
+
+def reduce_merge(pages):
+    args = request_input_args()
+    next_page_dict = None
+    start = time.perf_counter()
+    for _page in range(pages):
+        next_page_dict = next_page(next_page_dict)
+        args = update_args(validate_keys(next_page_dict), args)
+        authenticate_args, _reauth = authenticate()
+        args = update_args(validate_keys(authenticate_args), args)
+    return time.perf_counter() - start
+
+
+def plan_merge(pages):
+    plan = RequestPlan(request_input_args(), next_page, authenticate)
+    next_page_dict = None
+    start = time.perf_counter()
+    for _page in range(pages):
+        next_page_dict = next_page(next_page_dict)
+        plan.prepare(next_page_dict)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'pages':>8} {'update_args us/page':>20} {'RequestPlan us/page':>20}")
+    for pages in (1_000, 10_000, 100_000):
+        before = reduce_merge(pages) / pages * 1e6
+        after = plan_merge(pages) / pages * 1e6
+        print(f"{pages:>8} {before:>20.2f} {after:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
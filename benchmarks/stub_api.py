@@ -0,0 +1,116 @@
+"""Local paginated JSON API for the benchmarks.
+
+The pages are generated on request, so any number of records can be served
+without registering responses. ``GET /items`` pages through ``total``
+records with one of the paging styles below, each response has the records
+under ``data.items``.
+
+``offset``
+    ``?offset=0&limit=100``
+``page``
+    ``?page=1&per_page=100``, pages are numbered from 1
+``cursor``
+    ``?cursor=<token>&limit=100``, the next cursor is in ``data.next``
+``link``
+    ``?offset=0&limit=100`` with the next page url in the ``Link`` header
+"""
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+PAGING_STYLES = ("offset", "page", "cursor", "link")
+
+
+@dataclass
+class StubConfig:
+    """Shape of the stub API.
+
+    :param total: Number of records the API pages through.
+    :param latency: Seconds to wait before answering each request.
+    :param record_size: Approximate size of one record in bytes.
+    :param paging: One of :data:`PAGING_STYLES`.
+    """
+
+    total: int = 10_000
+    latency: float = 0.0
+    record_size: int = 100
+    paging: str = "offset"
+
+
+class StubAPI:
+    def __init__(self, config: StubConfig):
+        if config.paging not in PAGING_STYLES:
+            raise ValueError(f"Unknown paging style: {config.paging!r}")
+        self.config = config
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.padding = "x" * max(config.record_size - 40, 0)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/items"
+
+    def page(self, params: dict[str, str]) -> tuple[bytes, dict[str, str]]:
+        config = self.config
+        if config.paging == "page":
+            limit = int(params.get("per_page", 100))
+            offset = (int(params.get("page", 1)) - 1) * limit
+        elif config.paging == "cursor":
+            limit = int(params.get("limit", 100))
+            offset = int(params.get("cursor") or "0", 16)
+        else:
+            limit = int(params.get("limit", 100))
+            offset = int(params.get("offset", 0))
+        end = min(offset + limit, config.total)
+        data = {
+            "items": [
+                {"id": index, "name": f"record-{index}", "padding": self.padding}
+                for index in range(offset, end)
+            ]
+        }
+        headers = {}
+        if config.paging == "cursor":
+            data["next"] = format(end, "x") if end < config.total else None
+        elif config.paging == "link" and end < config.total:
+            headers["Link"] = f'<{self.url}?offset={end}&limit={limit}>; rel="next"'
+        return json.dumps({"data": data}).encode(), headers
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, without this every
+            # response waits for the delayed ACK of the client.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if stub.config.latency:
+                    time.sleep(stub.config.latency)
+                body, headers = stub.page(dict(parse_qsl(urlsplit(self.path).query)))
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,204 @@
+import asyncio
+import inspect
+from collections.abc import AsyncIterator
+from functools import reduce
+from typing import Any
+
+from urllib3 import HTTPResponse
+from urllib3.exceptions import MaxRetryError
+from urllib3.util import Retry
+
+from .inquestor import (
+    RequestPlan,
+    filter_request_input,
+    next_page,
+    validate_response,
+)
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+# Request arguments that httpx only accepts when the client is constructed.
+CLIENT_ONLY_INPUT = frozenset({"proxies", "verify", "hooks", "stream"})
+
+
+async def resolve(value):
+    """Awaits ``value`` if a hook returned an awaitable, so sync and async
+    hooks share one calling convention."""
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def to_httpx_args(request_input_args: dict[str, Any]) -> dict[str, Any]:
+    """Translates merged :func:`ingest` arguments into ``httpx`` request
+    keyword arguments."""
+    httpx_args = {
+        key: value
+        for key, value in request_input_args.items()
+        if value is not None and key not in CLIENT_ONLY_INPUT
+    }
+    httpx_args["url"] = str(httpx_args["url"])
+    # requests treats a missing timeout as "wait forever", keep that behaviour.
+    httpx_args["timeout"] = request_input_args.get("timeout")
+    httpx_args["follow_redirects"] = httpx_args.pop("allow_redirects", True)
+    if isinstance(httpx_args.get("data"), (bytes, str)):
+        httpx_args["content"] = httpx_args.pop("data")
+    return httpx_args
+
+
+def build_client(verify=None, cert=None, proxies=None):
+    """Creates the ``httpx.AsyncClient`` used when the caller does not pass
+    one, mapping requests style ``proxies`` onto httpx transport mounts."""
+    if httpx is None:
+        raise ImportError(
+            "aingest requires httpx, install it with `pip install inquestor[async]`"
+        )
+    mounts = None
+    if proxies:
+        mounts = {
+            (f"{key}://" if "://" not in key else key): httpx.AsyncHTTPTransport(
+                proxy=proxy
+            )
+            for key, proxy in proxies.items()
+        }
+    return httpx.AsyncClient(
+        verify=True if verify is None else verify, cert=cert, mounts=mounts
+    )
+
+
+async def send(client, request_args: dict[str, Any], retries: Retry | None = None):
+    """Sends one request, retrying it in place according to ``retries``.
+
+    Mirrors what the urllib3 ``Retry`` adapter does for :func:`ingest`:
+    statuses in ``status_forcelist`` are retried after the ``Retry-After``
+    delay or the exponential backoff, counting against both ``total`` and
+    ``status``. Once retries are exhausted the last response is returned so
+    it goes through :func:`validate_response`.
+    """
+    response = await client.request(**request_args)
+    method = request_args["method"].upper()
+    retry = retries
+    while retry is not None and retry.is_retry(
+        method, response.status_code, "Retry-After" in response.headers
+    ):
+        try:
+            retry = retry.increment(
+                method,
+                request_args["url"],
+                response=HTTPResponse(
+                    status=response.status_code,
+                    headers=dict(response.headers),
+                    preload_content=False,
+                ),
+            )
+        except MaxRetryError:
+            break
+        delay = None
+        if retry.respect_retry_after_header:
+            delay = retry.get_retry_after(response)
+        await asyncio.sleep(retry.get_backoff_time() if delay is None else delay)
+        response = await client.request(**request_args)
+    return response
+
+
+async def aingest(
+    method,
+    url,
+    params=None,
+    data=None,
+    headers=None,
+    cookies=None,
+    files=None,
+    auth=None,
+    timeout=None,
+    allow_redirects=True,
+    proxies=None,
+    hooks=None,
+    stream=None,
+    verify=None,
+    cert=None,
+    json=None,
+    retries: Retry | None = None,
+    next_page=next_page,
+    authenticate=None,
+    rate_limit=None,
+    client=None,
+) -> AsyncIterator[Any]:
+    """Asyncio version of :func:`inquestor.inquestor.ingest`.
+
+    Takes the same arguments and hooks as :func:`ingest` and yields the
+    decoded JSON pages with ``async for``. The ``next_page``,
+    ``authenticate`` and ``rate_limit`` hooks may be plain functions or
+    coroutine functions, and their return dicts are merged with the same
+    :class:`MutableRequestInput` semantics. Hooks receive ``httpx.Response``
+    objects. A :class:`RateLimiter` passed as ``rate_limit`` waits with
+    ``asyncio.sleep`` and a :class:`TokenProvider` passed as
+    ``authenticate`` fetches tokens on a worker thread, so neither blocks
+    the event loop.
+
+    :param client: (optional) ``httpx.AsyncClient`` to send the requests
+        with. Share one client between many concurrent ``aingest`` calls to
+        reuse its connection pool. When omitted a client is created from
+        ``verify``, ``cert`` and ``proxies`` and closed when the generator
+        finishes; these arguments are ignored when a client is given.
+    """
+    request_input_args = reduce(filter_request_input, locals().items(), {})
+
+    plan = RequestPlan(request_input_args, next_page, authenticate, rate_limit)
+    owns_client = client is None
+    if owns_client:
+        client = build_client(verify=verify, cert=cert, proxies=proxies)
+    reauth_dict = None
+    ratelimit_dict = None
+    response = None
+    try:
+        next_page_dict = await resolve(next_page())
+        while next_page_dict:
+            request_input_args = plan.merge(next_page_dict)
+
+            if plan.authenticate:
+                if plan.token_provider:
+                    # Fetching a token, or waiting for one, blocks the thread.
+                    authenticated = asyncio.to_thread(
+                        plan.authenticate, reauth_dict=reauth_dict, response=response
+                    )
+                else:
+                    authenticated = resolve(
+                        plan.authenticate(reauth_dict=reauth_dict, response=response)
+                    )
+                authenticate_args, reauth_dict = await authenticated
+                if authenticate_args:
+                    request_input_args = plan.merge(authenticate_args)
+            if plan.limiter:
+                await asyncio.sleep(plan.limit_delay(response))
+            elif plan.rate_limit:
+                ratelimit_dict = await resolve(
+                    plan.rate_limit(ratelimit_dict=ratelimit_dict, response=response)
+                )
+
+            response = await send(
+                client, to_httpx_args(request_input_args), retries=retries
+            )
+            if response.status_code == 401:
+                retry_args = await asyncio.to_thread(
+                    plan.reauthenticate, response, request_input_args
+                )
+                if retry_args:
+                    response = await send(
+                        client, to_httpx_args(retry_args), retries=retries
+                    )
+
+            if validate_response(response):
+                next_page_dict = await resolve(
+                    next_page(next_page_dict, response=response)
+                )
+                yield response.json()
+            else:
+                break
+    finally:
+        if owns_client:
+            await client.aclose()
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class TokenProvider:
+    """Expiry aware, single-flight token cache usable as ``authenticate``.
+
+    The token returned by ``fetch_token`` is cached until ``refresh_margin``
+    seconds before it expires. From then on the first caller starts a
+    refresh in the background while the current token keeps being handed
+    out, and only once the token has expired do callers wait for the new
+    one. However many threads or ingests share the provider, at most one
+    ``fetch_token`` call is in flight.
+
+    Passed as ``authenticate=`` to :func:`ingest`, the auth header is only
+    merged when the token changed, and a 401 response invalidates the token
+    and resends the request once with a fresh one.
+
+    :param fetch_token: Returns a new ``(token, expires_in_seconds)`` tuple.
+    :param refresh_margin: Seconds before expiry at which to refresh.
+    :param background: Refresh stale tokens on a background thread, when
+        False the caller that finds a stale token refreshes it instead.
+    :param header: Name of the header that carries the token.
+    :param scheme: Prefix of the header value, ``None`` for the bare token.
+    :param clock: Monotonic clock in seconds, for tests.
+    """
+
+    def __init__(
+        self,
+        fetch_token: Callable[[], tuple[str, float]],
+        refresh_margin: float = 30.0,
+        background: bool = True,
+        header: str = "Authorization",
+        scheme: str | None = "Bearer",
+        clock=time.monotonic,
+    ):
+        self.fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self.background = background
+        self.header = header
+        self.scheme = scheme
+        self.clock = clock
+        self.value: str | None = None
+        self.expires_at = float("-inf")
+        self.refreshing = False
+        self.condition = threading.Condition()
+
+    def token(self) -> str:
+        """Returns a token that has not expired, fetching one if needed."""
+        with self.condition:
+            while True:
+                now = self.clock()
+                # The cached token, None once it has expired.
+                value = self.value if now < self.expires_at else None
+                if value is not None and now < self.expires_at - self.refresh_margin:
+                    return value
+                if self.refreshing:
+                    if value is not None:
+                        return value
+                    self.condition.wait()
+                    continue
+                self.refreshing = True
+                if value is not None and self.background:
+                    threading.Thread(target=self.refresh_quietly, daemon=True).start()
+                    return value
+                break
+        return self.refresh()
+
+    def refresh(self) -> str:
+        """Fetches a new token, the caller must have set :attr:`refreshing`."""
+        start = self.clock()
+        try:
+            value, expires_in = self.fetch_token()
+        except Exception:
+            with self.condition:
+                self.refreshing = False
+                self.condition.notify_all()
+            raise
+        with self.condition:
+            self.value = value
+            self.expires_at = start + expires_in
+            self.refreshing = False
+            self.condition.notify_all()
+        return value
+
+    def refresh_quietly(self):
+        """Refreshes in the background. On failure callers keep the current
+        token and retry once it expires."""
+        try:
+            self.refresh()
+        except Exception:
+            pass
+
+    def header_value(self, token: str) -> str:
+        return f"{self.scheme} {token}" if self.scheme else token
+
+    def invalidate(self, header_value: str | None = None):
+        """Drops the cached token so the next call fetches a new one.
+
+        :param header_value: (optional) The header value that was rejected,
+            the token is kept if it has been refreshed since.
+        """
+        with self.condition:
+            if self.value is None:
+                return
+            if header_value is None or header_value == self.header_value(self.value):
+                self.value = None
+                self.expires_at = float("-inf")
+
+    def __call__(
+        self, reauth_dict: dict[str, Any] | None = None, response=None
+    ) -> tuple[dict[str, Any] | None, dict[str, Any]]:
+        header_value = self.header_value(self.token())
+        if reauth_dict and reauth_dict.get("header_value") == header_value:
+            return None, reauth_dict
+        return {"headers": {self.header: header_value}}, {"header_value": header_value}
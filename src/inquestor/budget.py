@@ -0,0 +1,127 @@
+import threading
+import weakref
+from collections import deque
+from collections.abc import Generator
+from typing import Any
+
+from requests import Response
+
+
+class MemoryBudget:
+    """Bounds the response bodies in memory across concurrent ingests.
+
+    Pass the same budget as ``budget=`` to every :func:`ingest` that should
+    share it. A fetch only starts while the bytes in flight are below
+    ``max_bytes``, otherwise it waits for other pages to be consumed. The
+    bytes of a page are in flight from its response until the consumer asks
+    for the next page. Buffered bodies count with their size, streamed bodies
+    with their ``Content-Length`` or, without one, the bytes read so far.
+
+    Pages queued for ``lookahead`` or ``decode_processes`` stay in flight
+    until the consumer takes them from the queue.
+
+    A fetch waits for pages held by its own thread as well. Consume ingests
+    that share a budget on separate threads, interleaving them on one
+    thread, such as with ``zip``, deadlocks once the budget is exhausted by
+    the pages that thread holds.
+
+    :param max_bytes: Bytes in flight above which new fetches wait.
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self.peak = 0
+        self.condition = threading.Condition()
+
+    def wait(self, block: bool = True) -> bool:
+        """Returns whether a fetch may start, waiting for it unless ``block``
+        is false."""
+        with self.condition:
+            if block:
+                self.condition.wait_for(lambda: self.in_flight < self.max_bytes)
+            return self.in_flight < self.max_bytes
+
+    def acquire(self, nbytes: int):
+        with self.condition:
+            self.in_flight += nbytes
+            self.peak = max(self.peak, self.in_flight)
+
+    def release(self, nbytes: int):
+        with self.condition:
+            self.in_flight -= nbytes
+            self.condition.notify_all()
+
+    def charge(self, response: Response, stream: bool = False):
+        """Counts the body of the response until :func:`release_response` is
+        called or the response is garbage collected."""
+        charged = [0]
+
+        def acquire(nbytes):
+            # Bytes read after the release are not counted, the finalizer
+            # only runs once.
+            if finalizer.alive:
+                self.acquire(nbytes)
+                charged[0] += nbytes
+
+        def release():
+            self.release(charged[0])
+
+        finalizer = weakref.finalize(response, release)
+        setattr(response, "release_budget", finalizer)
+        content_length = response.headers.get("Content-Length", "")
+        if not stream:
+            acquire(len(response.content))
+        elif content_length.isdigit():
+            acquire(int(content_length))
+        else:
+            # Referenced weakly, the response would otherwise keep itself
+            # alive through its own attribute. It is resolved when
+            # iter_content is called, the chunks may be read after whoever
+            # sent the request dropped the response.
+            ref = weakref.ref(response)
+            iter_content = type(response).iter_content
+
+            def counted(chunks):
+                for chunk in chunks:
+                    acquire(len(chunk))
+                    yield chunk
+
+            def counted_iter_content(*args, **kwargs):
+                referent = ref()
+                if referent is None:
+                    raise RuntimeError("the response was garbage collected")
+                return counted(iter_content(referent, *args, **kwargs))
+
+            setattr(response, "iter_content", counted_iter_content)
+
+    def send(self, send, request_input_args):
+        """Sends the request with ``send`` and charges its response."""
+        sent = send(request_input_args)
+        self.charge(sent[0], stream=request_input_args.get("stream", False))
+        return sent
+
+
+def release_response(response: Response | None):
+    """Releases the bytes charged for the response, if any."""
+    release = getattr(response, "release_budget", None)
+    if release:
+        release()
+
+
+def release_consumed(
+    pages: Generator[Any, None, None], held: deque[Response]
+) -> Generator[Any, None, None]:
+    """Yields the pages and releases the response of each, which the stages
+    before appended to ``held``, once the consumer asks for the next page."""
+    response = None
+    try:
+        for page in pages:
+            response = held.popleft()
+            yield page
+            release_response(response)
+    finally:
+        release_response(response)
+        pages.close()
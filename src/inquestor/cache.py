@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Request arguments that do not change the response that is cached.
+UNKEYED_ARGS = frozenset(
+    {"auth", "timeout", "allow_redirects", "proxies", "hooks", "stream", "verify"}
+)
+UNKEYED_HEADERS = frozenset(
+    {"authorization", "proxy-authorization", "if-none-match", "if-modified-since"}
+)
+
+
+def cache_key(request_input_args: dict[str, Any]) -> str:
+    """Hashes the merged request arguments, without the credentials."""
+    keyed = {}
+    for key, value in request_input_args.items():
+        if key in UNKEYED_ARGS or value is None:
+            continue
+        if key == "headers":
+            value = {
+                name.lower(): header
+                for name, header in value.items()
+                if name.lower() not in UNKEYED_HEADERS
+            }
+        keyed[key] = value
+    text = json.dumps(keyed, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResponseCache:
+    """On-disk cache of validated responses for :func:`ingest`.
+
+    Responses with an ``ETag`` or ``Last-Modified`` header are stored in a
+    SQLite database, keyed on the merged request arguments without the
+    authorization headers. The next request for the same arguments is sent
+    with ``If-None-Match`` / ``If-Modified-Since`` and a ``304 Not
+    Modified`` is answered with the stored response, so unchanged pages are
+    not downloaded again. Streamed responses are not cached.
+
+    The cache keeps one database connection, close it with :meth:`close` or
+    use the cache as a context manager.
+
+    :param path: Path of the SQLite database.
+    :param max_bytes: Size of the stored bodies above which the least
+        recently used responses are evicted.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], max_bytes: int = 256 * 1024 * 1024
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # Shared by the prefetch threads, every use holds the lock.
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY,"
+                " etag TEXT, last_modified TEXT, status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL, body BLOB NOT NULL,"
+                " size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_used ON responses (used)"
+            )
+
+    def validators(self, key: str) -> tuple[str | None, str | None] | None:
+        with self.lock, self.connection as connection:
+            return connection.execute(
+                "SELECT etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def load(self, key: str) -> tuple[int, dict[str, str], bytes] | None:
+        """Returns the stored response and marks it as recently used."""
+        with self.lock, self.connection as connection:
+            row = connection.execute(
+                "SELECT status, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                connection.execute(
+                    "UPDATE responses SET used = ? WHERE key = ?", (time.time(), key)
+                )
+        return row and (row[0], json.loads(row[1]), row[2])
+
+    def store(self, key: str, response: Response):
+        body = response.content
+        with self.lock, self.connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    response.status_code,
+                    json.dumps(dict(response.headers)),
+                    body,
+                    len(body),
+                    time.time(),
+                ),
+            )
+            self.evict(connection)
+
+    def evict(self, connection):
+        """Deletes the least recently used responses above :attr:`max_bytes`."""
+        (total,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = connection.execute("SELECT key, size FROM responses ORDER BY used")
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self):
+        with self.lock, self.connection as connection:
+            connection.execute("DELETE FROM responses")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, session, **request_input_args) -> Response:
+        """Sends the request conditionally and answers a 304 from the cache.
+
+        The returned response has a ``from_cache`` attribute.
+        """
+        key = cache_key(request_input_args)
+        validators = self.validators(key)
+        if validators:
+            etag, last_modified = validators
+            conditional = {}
+            if etag:
+                conditional["If-None-Match"] = etag
+            if last_modified:
+                conditional["If-Modified-Since"] = last_modified
+            request_input_args = request_input_args | {
+                "headers": (request_input_args.get("headers") or {}) | conditional
+            }
+        response = session.request(**request_input_args)
+        setattr(response, "from_cache", False)
+        if response.status_code == 304 and validators:
+            stored = self.load(key)
+            if stored:
+                return cached_response(response, *stored)
+        elif (
+            response.status_code == 200
+            and not request_input_args.get("stream")
+            and ("ETag" in response.headers or "Last-Modified" in response.headers)
+        ):
+            self.store(key, response)
+        return response
+
+
+def cached_response(
+    response: Response, status: int, headers: dict[str, str], body: bytes
+) -> Response:
+    """Builds the stored response for a ``304 Not Modified`` response."""
+    cached = Response()
+    cached.status_code = status
+    cached.reason = "OK"
+    cached.headers = CaseInsensitiveDict(headers)
+    for name in ("ETag", "Last-Modified", "Date", "Cache-Control", "Expires"):
+        if name in response.headers:
+            cached.headers[name] = response.headers[name]
+    cached._content = body
+    cached.encoding = get_encoding_from_headers(cached.headers)
+    cached.url = response.url
+    cached.request = response.request
+    cached.elapsed = response.elapsed
+    cached.raw = response.raw
+    cached.cookies = response.cookies
+    cached.connection = response.connection
+    setattr(cached, "from_cache", True)
+    return cached
@@ -0,0 +1,201 @@
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from urllib3.util import Url, parse_url
+
+from .store import KeyValueTable, replace_text
+
+
+@dataclass
+class CheckpointState:
+    """Where an ingest run got to.
+
+    :param next_page: The merged ``next_page`` dicts of the run, enough to
+        send the request of the first page that has not been consumed.
+    :param pages: Number of pages consumed so far.
+    """
+
+    next_page: dict[str, Any]
+    pages: int
+
+
+def encode(value: Any) -> Any:
+    if isinstance(value, Url):
+        return {"__url__": str(value)}
+    if isinstance(value, dict):
+        return {key: encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(item) for item in value]
+    return value
+
+
+def decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if value.keys() == {"__url__"}:
+            return parse_url(value["__url__"])
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+def dumps(state: CheckpointState) -> str:
+    return json.dumps({"next_page": encode(state.next_page), "pages": state.pages})
+
+
+def loads(text: str) -> CheckpointState:
+    state = json.loads(text)
+    return CheckpointState(next_page=decode(state["next_page"]), pages=state["pages"])
+
+
+class Checkpoint(ABC):
+    """Stores the progress of an ingest run so it can be resumed.
+
+    The state is saved once ``every`` pages or ``interval`` seconds have
+    passed since the last save, whichever comes first, when the run stops
+    early and cleared once the run completes.
+
+    :param every: Save after this many consumed pages.
+    :param interval: (optional) Save after this many seconds.
+    """
+
+    def __init__(self, every: int = 100, interval: float | None = 60.0):
+        self.every = every
+        self.interval = interval
+
+    @abstractmethod
+    def load(self) -> CheckpointState | None: ...
+
+    @abstractmethod
+    def save(self, state: CheckpointState): ...
+
+    @abstractmethod
+    def clear(self): ...
+
+    def close(self):
+        """Releases what the store holds open, nothing by default."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FileCheckpoint(Checkpoint):
+    """Keeps the checkpoint in a JSON file, replaced atomically on save."""
+
+    def __init__(self, path: str | os.PathLike[str], every=100, interval=60.0):
+        super().__init__(every=every, interval=interval)
+        self.path = Path(path)
+
+    def load(self) -> CheckpointState | None:
+        try:
+            return loads(self.path.read_text())
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: CheckpointState):
+        replace_text(self.path, dumps(state))
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+class SQLiteCheckpoint(Checkpoint):
+    """Keeps the checkpoints of many feeds in one SQLite database.
+
+    The database connection stays open until :meth:`close`, or use the
+    checkpoint as a context manager.
+
+    :param key: Name of the feed in the database.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], key: str, every=100, interval=60.0
+    ):
+        super().__init__(every=every, interval=interval)
+        self.path = path
+        self.key = key
+        self.table = KeyValueTable(path, "checkpoints", "state")
+
+    def load(self) -> CheckpointState | None:
+        text = self.table.get(self.key)
+        return loads(text) if text is not None else None
+
+    def save(self, state: CheckpointState):
+        self.table.put(self.key, dumps(state))
+
+    def clear(self):
+        self.table.delete(self.key)
+
+    def close(self):
+        self.table.close()
+
+
+def merge_cursor(cursor: dict[str, Any], next_page_dict) -> dict[str, Any]:
+    """Merges a ``next_page`` dict into a copy of the cursor."""
+    if not next_page_dict:
+        return cursor
+    merged = dict(cursor)
+    for key, value in next_page_dict.items():
+        current = merged.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = current | value
+        elif isinstance(value, dict):
+            merged[key] = dict(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class CheckpointTracker:
+    """Follows the pages of one ingest run and saves them to a checkpoint."""
+
+    def __init__(self, checkpoint: Checkpoint, resume: bool = False):
+        self.checkpoint = checkpoint
+        self.resumed = checkpoint.load() if resume else None
+        self.pages = self.resumed.pages if self.resumed else 0
+        self.cursor = self.resumed.next_page if self.resumed else {}
+        self.scheduled = self.cursor
+        self.saved_pages = self.pages
+        self.saved_at = time.monotonic()
+
+    def start(self, next_page) -> Any:
+        """Returns the first ``next_page`` dict, the resumed one if any."""
+        if self.resumed:
+            return decode(encode(self.cursor))
+        first = next_page()
+        self.cursor = self.scheduled = merge_cursor({}, first)
+        return first
+
+    def advance(self, next_page_dict) -> dict[str, Any]:
+        """Adds the dict of the next page to schedule to the cursor.
+
+        :return: The cursor that leads to that page.
+        """
+        self.scheduled = merge_cursor(self.scheduled, next_page_dict)
+        return self.scheduled
+
+    def consumed(self, cursor: dict[str, Any]):
+        """Records that a page was consumed, ``cursor`` leads to the next."""
+        self.pages += 1
+        self.cursor = cursor
+        if self.pages - self.saved_pages >= self.checkpoint.every or (
+            self.checkpoint.interval is not None
+            and time.monotonic() - self.saved_at >= self.checkpoint.interval
+        ):
+            self.save()
+
+    def save(self):
+        self.checkpoint.save(CheckpointState(next_page=self.cursor, pages=self.pages))
+        self.saved_pages = self.pages
+        self.saved_at = time.monotonic()
+
+    def finish(self):
+        self.checkpoint.clear()
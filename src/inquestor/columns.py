@@ -0,0 +1,96 @@
+import math
+from array import array, typecodes
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from .dedup import field_getter
+
+try:
+    import numpy  # pyright: ignore[reportMissingImports]
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+# Array typecodes of the Python types that can be given as type hints, str
+# columns stay lists.
+TYPECODES: dict[type, str | None] = {float: "d", int: "q", bool: "b", str: None}
+
+Column = array[Any] | list[Any]
+
+
+def optional_getter(field: str) -> Callable[[Any], Any]:
+    """Returns a function that reads a dotted field, or None when the record
+    does not have it."""
+    get = field_getter(field)
+
+    def get_or_none(record):
+        try:
+            return get(record)
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    return get_or_none
+
+
+class Projection:
+    """Turns batches of records into columns of the projected fields.
+
+    Pass it as ``columns=`` to :func:`ingest` together with ``records`` and
+    ``batch_size``, every batch is then yielded as a dict of columns instead
+    of a list of records, so the fields that are not projected are dropped
+    with their page.
+
+    Typed columns are kept in an :class:`array.array`, missing values become
+    NaN in float columns and are an error in the others. Columns without a
+    type are lists.
+
+    :param fields: Dotted paths of the fields to keep, or a dict of column
+        name to dotted path.
+    :param types: (optional) Type per column name, ``float``, ``int``,
+        ``bool``, ``str`` or an :mod:`array` typecode.
+    :param as_numpy: Yield the typed columns as NumPy arrays, requires numpy.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str] | dict[str, str],
+        types: dict[str, type | str] | None = None,
+        as_numpy: bool = False,
+    ):
+        if not isinstance(fields, dict):
+            fields = {field: field for field in fields}
+        types = types or {}
+        unknown = set(types) - set(fields)
+        if unknown:
+            raise ValueError(f"types given for unknown columns: {sorted(unknown)}")
+        if as_numpy and numpy is None:
+            raise ImportError("as_numpy requires numpy to be installed")
+        self.fields = fields
+        self.getters = {name: optional_getter(path) for name, path in fields.items()}
+        self.typecodes: dict[str, str | None] = {}
+        for name, kind in types.items():
+            typecode = kind if isinstance(kind, str) else TYPECODES.get(kind, "")
+            if typecode is not None and typecode not in tuple(typecodes):
+                raise ValueError(f"unsupported type for column {name!r}")
+            self.typecodes[name] = typecode
+        self.as_numpy = as_numpy
+
+    def column(self, name: str, records: Sequence[Any]) -> Column:
+        values = map(self.getters[name], records)
+        typecode = self.typecodes.get(name)
+        if typecode is None:
+            return list(values)
+        if typecode in "fd":
+            values = (math.nan if value is None else value for value in values)
+        try:
+            column = array(typecode, values)
+        except TypeError as error:
+            raise ValueError(f"column {name!r}: {error}") from error
+        if self.as_numpy and numpy is not None:
+            return numpy.asarray(column)
+        return column
+
+    def __call__(self, records: Iterable[Any]) -> dict[str, Column]:
+        """Returns the columns of a batch of records."""
+        if not isinstance(records, Sequence):
+            records = list(records)
+        return {name: self.column(name, records) for name in self.fields}
@@ -0,0 +1,43 @@
+import json
+from collections.abc import Callable
+from typing import Any
+
+from urllib3.util import make_headers
+
+try:
+    import orjson  # pyright: ignore[reportMissingImports]
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgspec  # pyright: ignore[reportMissingImports]
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+type Decoder = Callable[[bytes], Any]
+
+# Every content coding urllib3 can decode here, zstd and br when installed.
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+
+def fastest_loads() -> Decoder:
+    """Returns the fastest installed JSON decoder for ``ingest(decoder=...)``:
+    orjson, msgspec or the standard library."""
+    if orjson is not None:
+        return orjson.loads
+    if msgspec is not None:
+        return msgspec.json.decode
+    return json.loads
+
+
+def accept_encoding_header(value: bool | str) -> str:
+    """The ``Accept-Encoding`` header for ``ingest(accept_encoding=...)``.
+
+    True accepts every coding urllib3 can decode, False asks for the
+    uncompressed body and a string is sent as is, e.g. ``"gzip"``.
+    """
+    if value is True:
+        return ACCEPT_ENCODING
+    if value is False:
+        return "identity"
+    return value
@@ -0,0 +1,118 @@
+import math
+from collections import OrderedDict
+from collections.abc import Callable
+from hashlib import blake2b
+from typing import Any
+
+
+class BloomFilter:
+    """Bit array membership filter with no false negatives.
+
+    :param capacity: Number of keys the filter is sized for.
+    :param error_rate: False positive rate at ``capacity`` keys.
+    :param max_bytes: (optional) Upper bound on the bit array, a smaller
+        array raises the false positive rate instead.
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float = 0.001, max_bytes: int | None = None
+    ):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        if max_bytes is not None:
+            bits = min(bits, max_bytes * 8)
+        self.size = max(bits, 8)
+        self.hashes = max(round(self.size / max(capacity, 1) * math.log(2)), 1)
+        self.bits = bytearray(math.ceil(self.size / 8))
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def positions(self, key: bytes):
+        # Double hashing, k positions from the two halves of one digest.
+        digest = blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self.positions(key)
+        )
+
+    def add(self, key: bytes) -> bool:
+        """Adds ``key`` and returns whether it was (probably) present."""
+        present = True
+        for position in self.positions(key):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                present = False
+                self.bits[byte] |= 1 << bit
+        if not present:
+            self.count += 1
+        return present
+
+
+def field_getter(field: str) -> Callable[[Any], Any]:
+    """Returns a function that reads a dotted field such as ``meta.id``."""
+    names = field.split(".")
+
+    def get(record):
+        for name in names:
+            record = record[name]
+        return record
+
+    return get
+
+
+class Deduplicator:
+    """Drops records whose key was seen before, in bounded memory.
+
+    Recent keys are kept exactly in an LRU, which catches the duplicates
+    that shifting offset pages produce, since those are close together.
+    Older keys are only remembered by a :class:`BloomFilter`: a record
+    whose key is not recent but is in the filter is dropped, so at most
+    ``error_rate`` of the unique records are lost as false positives.
+
+    Pass it as ``dedup=`` to :func:`ingest` together with ``records``.
+
+    :param key: Field of the record to deduplicate on, dotted for nested
+        fields, or a function of the record.
+    :param capacity: Number of unique keys the filter is sized for.
+    :param error_rate: False positive rate at ``capacity`` keys.
+    :param max_bytes: (optional) Memory cap of the filter.
+    :param recent: Number of recent keys to keep exactly.
+    """
+
+    def __init__(
+        self,
+        key: str | Callable[[Any], Any],
+        capacity: int = 10_000_000,
+        error_rate: float = 0.001,
+        max_bytes: int | None = None,
+        recent: int = 100_000,
+    ):
+        self.key = field_getter(key) if isinstance(key, str) else key
+        self.bloom = BloomFilter(capacity, error_rate, max_bytes)
+        self.recent = OrderedDict()
+        self.max_recent = recent
+        self.duplicates = 0
+
+    def seen(self, record) -> bool:
+        """Returns whether the record is a duplicate and remembers its key."""
+        key = self.key(record)
+        if key in self.recent:
+            self.recent.move_to_end(key)
+            self.duplicates += 1
+            return True
+        self.recent[key] = None
+        if len(self.recent) > self.max_recent:
+            self.recent.popitem(last=False)
+        if self.bloom.add(repr(key).encode()):
+            self.duplicates += 1
+            return True
+        return False
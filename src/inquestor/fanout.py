@@ -0,0 +1,185 @@
+import threading
+from collections.abc import Hashable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple
+from urllib.parse import urlsplit
+
+from requests import Session
+
+from .inquestor import PoolConfig, ingest, mount_adapters
+from .workers import DONE, FAILED, Handoff
+
+
+@dataclass
+class IngestSpec:
+    """One feed for :func:`ingest_many`.
+
+    ``kwargs`` holds any other :func:`ingest` argument such as ``params``,
+    ``next_page``, ``authenticate``, ``rate_limit`` or ``retries``. The
+    ``source`` tags the results of this feed and defaults to its url.
+    """
+
+    method: str
+    url: Any
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    source: Hashable = None
+
+    def __post_init__(self):
+        if self.source is None:
+            self.source = str(self.url)
+
+
+class IngestResult(NamedTuple):
+    source: Hashable
+    page: Any
+
+
+class HostLimiter:
+    """Bounds the requests in flight, in total and per host."""
+
+    def __init__(self, concurrency: int, per_host: int | None = None):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.per_host = per_host
+        self.hosts: dict[str, threading.BoundedSemaphore] = {}
+        self.lock = threading.Lock()
+
+    def host_slots(self, url, per_host: int):
+        host = urlsplit(str(url)).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = threading.BoundedSemaphore(per_host)
+            return self.hosts[host]
+
+    @contextmanager
+    def limit(self, url):
+        per_host = self.per_host
+        if per_host is None:
+            with self.slots:
+                yield
+            return
+        with self.host_slots(url, per_host), self.slots:
+            yield
+
+
+class LimitedSession(Session):
+    """:class:`Session` whose requests wait for a :class:`HostLimiter` slot."""
+
+    def __init__(self, limiter: HostLimiter):
+        super().__init__()
+        self.limiter = limiter
+
+    def request(self, method, url, *args, **kwargs):
+        with self.limiter.limit(url):
+            return super().request(method, url, *args, **kwargs)
+
+
+def ingest_many(
+    specs: list[IngestSpec],
+    concurrency: int = 10,
+    per_host: int | None = None,
+    ordered: bool = False,
+    buffer: int | None = None,
+    pool: PoolConfig | None = None,
+) -> Iterator[IngestResult]:
+    """Runs many :func:`ingest` feeds concurrently over one connection pool.
+
+    Every feed runs on a worker thread and sends its requests through the
+    adapters of a shared session, so TCP and TLS connections are reused
+    between feeds. Feeds with the same ``retries`` object share one set of
+    adapters; every feed has its own session and cookies.
+
+    :param specs: The feeds to ingest.
+    :param concurrency: Maximum number of requests in flight overall.
+    :param per_host: (optional) Maximum number of requests in flight per
+        host, unlimited by default.
+    :param ordered: When False results are yielded as soon as they arrive,
+        when True all pages of one spec are yielded before the next spec,
+        in the order of ``specs``; later feeds keep fetching meanwhile.
+    :param buffer: (optional) Maximum number of fetched pages waiting to be
+        consumed before the feeds pause, ``2 * concurrency`` by default.
+        When ordered it is split between the feeds that run at once, each
+        keeps at least one page.
+    :param pool: (optional) :class:`PoolConfig` of the shared sessions,
+        sized for ``concurrency`` and the number of hosts by default.
+    :return: Iterator of :class:`IngestResult` tagged with the spec source.
+    """
+    limiter = HostLimiter(concurrency, per_host)
+    if pool is None:
+        hosts = {urlsplit(str(spec.url)).netloc for spec in specs}
+        pool = PoolConfig(
+            pool_connections=max(len(hosts), 10),
+            pool_maxsize=per_host or concurrency,
+        )
+    sessions = {}
+    for spec in specs:
+        retries = spec.kwargs.get("retries")
+        if id(retries) not in sessions:
+            sessions[id(retries)] = mount_adapters(
+                LimitedSession(limiter), retries=retries, pool=pool
+            )
+
+    buffer = buffer or 2 * concurrency
+    if ordered:
+        # One queue per feed, so only the feed being yielded is drained.
+        running = max(min(concurrency, len(specs)), 1)
+        queues = [Handoff(max(buffer // running, 1)) for _spec in specs]
+    else:
+        queues = [Handoff(buffer)] * len(specs)
+
+    def run(index, spec):
+        kwargs = {key: value for key, value in spec.kwargs.items() if key != "retries"}
+        session = feed_session(sessions[id(spec.kwargs.get("retries"))], limiter)
+        results = queues[index]
+        try:
+            pages = ingest(spec.method, spec.url, session=session, **kwargs)
+            try:
+                for page in pages:
+                    if not results.put((index, IngestResult(spec.source, page))):
+                        return
+            finally:
+                pages.close()
+            results.put((index, DONE))
+        except Exception as error:
+            results.put((index, FAILED, error))
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        for index, spec in enumerate(specs):
+            executor.submit(run, index, spec)
+        if ordered:
+            for results in queues:
+                yield from collect(results, 1)
+        elif queues:
+            yield from collect(queues[0], len(specs))
+    finally:
+        for results in queues:
+            results.close()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for session in sessions.values():
+            session.close()
+
+
+def feed_session(shared: Session, limiter: HostLimiter) -> Session:
+    """Creates the session of one feed, with the adapters and headers of
+    ``shared`` but its own cookies, so feeds do not see each other's."""
+    session = LimitedSession(limiter)
+    session.adapters = shared.adapters
+    session.headers = shared.headers.copy()
+    return session
+
+
+def collect(results: Handoff, feeds: int):
+    """Yields the queued results of ``feeds`` feeds, re-raising the first
+    feed error."""
+    finished = 0
+    while finished < feeds:
+        item = results.get()
+        result = item[1]
+        if result is FAILED:
+            raise item[2]
+        if result is DONE:
+            finished += 1
+        else:
+            yield result
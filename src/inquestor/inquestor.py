@@ -1,10 +1,43 @@
 from typing import Any
-from functools import reduce
+from functools import partial, reduce
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 import inspect
 from requests import Response, Session
 from urllib3.util import Url, Retry
 from enum import Enum
-from requests.adapters import HTTPAdapter
+from requests.adapters import (
+    DEFAULT_POOLBLOCK,
+    DEFAULT_POOLSIZE,
+    DEFAULT_RETRIES,
+    HTTPAdapter,
+)
+from collections.abc import Callable, Generator, Iterator
+from dataclasses import dataclass
+from itertools import batched, chain, filterfalse
+import logging
+import threading
+import time
+
+from .auth import TokenProvider
+from .budget import MemoryBudget, release_consumed, release_response
+from .cache import ResponseCache
+from .checkpoint import Checkpoint, CheckpointTracker
+from .columns import Projection
+from .decoders import Decoder, accept_encoding_header
+from .dedup import Deduplicator
+from .instrument import Probe, Subscriber
+from .offload import decode_pages
+from .policy import ErrorPolicy
+from .ratelimit import RateLimiter
+from .records import extract_records, iter_records, parse_path
+from .tuning import PageSizeTuner
+from .watermark import Watermark
+from .workers import DONE, FAILED, Handoff
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+logger = logging.getLogger(__name__)
 
 
 class MutableRequestInput(Enum):
@@ -82,17 +115,19 @@ def authenticate(
     }, reauth_dict
 
 
+VALID_KEYS = frozenset(MutableRequestInput.__members__)
+
+
 def validate_keys(args_dict):
-    valid_keys = set(MutableRequestInput.__members__.keys())
-    invalid_keys = set(args_dict.keys()) - valid_keys
+    if args_dict.keys() <= VALID_KEYS:
+        return args_dict
+    invalid_keys = set(args_dict.keys()) - VALID_KEYS
 
-    if invalid_keys:
-        raise ValueError(
-            f"Invalid keyword(s) provided: {sorted(invalid_keys)}"
-            f"Valid keywords are: {sorted(valid_keys)}"
-            "The authenticate or next_page return dict is not valid."
-        )
-    return args_dict
+    raise ValueError(
+        f"Invalid keyword(s) provided: {sorted(invalid_keys)}"
+        f"Valid keywords are: {sorted(VALID_KEYS)}"
+        "The authenticate or next_page return dict is not valid."
+    )
 
 
 def update_arg(item, args_dict):
@@ -118,6 +153,145 @@ def update_args(args_dict, input_dict):
     return reduce(process_item, input_dict.items(), {})
 
 
+def merge_args(args, args_dict):
+    """Merges ``args_dict`` into ``args`` in place, see :func:`update_args`."""
+    for key, value in args_dict.items():
+        if key in args:
+            current = args[key]
+            if isinstance(value, dict) and isinstance(current, dict):
+                current |= value
+            else:
+                args[key] = value
+    return args
+
+
+class RequestPlan:
+    """The request arguments and hooks of one ingest run.
+
+    The hooks are validated once when the plan is created and the dicts
+    returned by the hooks are merged into :attr:`args` in place, with the
+    same semantics as :func:`update_args`: dict values are merged into the
+    current dict, any other value replaces it and unknown keys are ignored.
+
+    ``authenticate`` is either a hook function or a :class:`TokenProvider`,
+    ``rate_limit`` is either a hook function or a :class:`RateLimiter`.
+    With a :class:`Probe` the hooks are wrapped to time every call, with a
+    :class:`PageSizeTuner` the page size params are set before every request.
+    :attr:`validate` decides which responses are yielded, by default
+    :func:`validate_response`, and :attr:`completed` is set once the pages
+    ran out because ``next_page`` said so or the last page was empty.
+    """
+
+    def __init__(
+        self,
+        request_input_args,
+        next_page,
+        authenticate=None,
+        rate_limit=None,
+        probe: Probe | None = None,
+        page_size: PageSizeTuner | None = None,
+        validate=None,
+    ):
+        self.args = dict(request_input_args)
+        self.page_size = page_size
+        self.validate = validate or validate_response
+        self.next_page = check_is_function(next_page)
+        self.token_provider = None
+        if isinstance(authenticate, TokenProvider):
+            self.token_provider = authenticate
+        else:
+            authenticate = authenticate and check_is_function(authenticate)
+        self.authenticate = authenticate
+        self.limiter: RateLimiter | None = None
+        if isinstance(rate_limit, RateLimiter):
+            self.limiter, rate_limit = rate_limit, None
+        self.rate_limit = rate_limit and check_is_function(rate_limit)
+        self.reauth_dict = None
+        self.ratelimit_dict = None
+        self.observed = None
+        self.completed = False
+        if probe:
+            self.next_page = probe.timed("next_page", self.next_page)
+            if self.authenticate:
+                self.authenticate = probe.timed("authenticate", self.authenticate)
+            if self.limiter or self.rate_limit:
+                self.throttle = probe.timed("rate_limit", self.throttle)
+
+    def merge(self, args_dict):
+        return merge_args(self.args, validate_keys(args_dict))
+
+    def prepare(self, next_page_dict, response: Response | None = None):
+        """Merges the next page and authenticate arguments and runs the rate
+        limit hook, ready to send the next request.
+
+        :param response: The latest response, passed on to the hooks.
+        :return: The merged request arguments.
+        """
+        self.merge(next_page_dict)
+        if self.page_size:
+            self.merge(
+                {"params": self.page_size.params(self.args.get("params"), response)}
+            )
+        if self.authenticate:
+            authenticate_args, self.reauth_dict = self.authenticate(
+                reauth_dict=self.reauth_dict, response=response
+            )
+            if authenticate_args:
+                self.merge(authenticate_args)
+        self.throttle(response)
+        return self.args
+
+    def throttle(self, response: Response | None = None):
+        """Waits for the :class:`RateLimiter` or runs the rate limit hook."""
+        if self.limiter:
+            delay = self.limit_delay(response)
+            if delay > 0:
+                time.sleep(delay)
+        elif self.rate_limit:
+            self.ratelimit_dict = self.rate_limit(
+                ratelimit_dict=self.ratelimit_dict, response=response
+            )
+
+    def reauthenticate(self, response: Response, request_args):
+        """Refreshes the token of a :class:`TokenProvider` after a 401.
+
+        :param request_args: The arguments of the rejected request.
+        :return: The arguments to resend the request with, or None when the
+            request should not be resent.
+        """
+        token_provider, authenticate = self.token_provider, self.authenticate
+        if response.status_code != 401 or token_provider is None or not authenticate:
+            return None
+        rejected = response.request.headers.get(token_provider.header)
+        if isinstance(rejected, bytes):
+            rejected = rejected.decode("latin-1")
+        token_provider.invalidate(rejected)
+        authenticate_args, self.reauth_dict = authenticate(
+            reauth_dict=self.reauth_dict, response=response
+        )
+        if not authenticate_args:
+            return None
+        self.merge(authenticate_args)
+        if request_args is not self.args:
+            merge_args(request_args, authenticate_args)
+        return request_args
+
+    def limit_delay(self, response: Response | None = None) -> float:
+        """Lets the :class:`RateLimiter` adapt to a response it has not seen
+        yet and reserves the next request.
+
+        :return: The seconds to wait before sending the request, 0 without
+            a :class:`RateLimiter`.
+        """
+        limiter = self.limiter
+        if limiter is None:
+            return 0.0
+        if response is not None and response is not self.observed:
+            self.observed = response
+            limiter.update(response)
+        return limiter.reserve(self.args["url"])
+
+
 def validate_response(response: Response) -> bool:
     """Validates the response object.
 
@@ -127,19 +301,140 @@ def validate_response(response: Response) -> bool:
     if response.status_code == 200:
         return True
     elif response.status_code in {401, 403}:
-        print("Authentication error or forbidden access.")
+        logger.warning(
+            "Authentication error or forbidden access: %s", response.status_code
+        )
         return False
     else:
-        print(f"Unexpected status code: {response.status_code}")
+        logger.warning("Unexpected status code: %s", response.status_code)
         return False
 
 
+def empty_response(response: Response, stream=False) -> bool:
+    """Whether the response has no body, such as a 204 No Content.
+
+    :param stream: The body is not downloaded yet, only the headers are
+        checked so it is not read.
+    """
+    if stream:
+        return (
+            response.status_code == 204 or response.headers.get("Content-Length") == "0"
+        )
+    return not response.content
+
+
 def rate_limit(
     ratelimit_dict: dict[str, Any] | None = None, response: Response | None = None
 ):
     pass
 
 
+@dataclass
+class PoolConfig:
+    """Connection pool settings for the adapters :func:`make_session` mounts.
+
+    :param pool_connections: Number of per-host pools to keep.
+    :param pool_maxsize: Maximum number of connections kept per host.
+    :param pool_block: Whether to wait for a free connection instead of
+        opening a throwaway one when a pool is exhausted.
+    :param keep_alive: Set to False to close connections after every request.
+    """
+
+    pool_connections: int = DEFAULT_POOLSIZE
+    pool_maxsize: int = DEFAULT_POOLSIZE
+    pool_block: bool = DEFAULT_POOLBLOCK
+    keep_alive: bool = True
+
+
+def mount_adapters(
+    session: Session, retries: Retry | None = None, pool: PoolConfig | None = None
+) -> Session:
+    """Mounts one pooled :class:`HTTPAdapter` for both http and https."""
+    pool = pool or PoolConfig()
+    adapter = HTTPAdapter(
+        pool_connections=pool.pool_connections,
+        pool_maxsize=pool.pool_maxsize,
+        max_retries=retries or DEFAULT_RETRIES,
+        pool_block=pool.pool_block,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not pool.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def make_session(retries: Retry | None = None, pool: PoolConfig | None = None):
+    """Creates a :class:`Session` that can be shared between :func:`ingest`
+    runs, so long-lived workers keep their connections warm."""
+    return mount_adapters(Session(), retries=retries, pool=pool)
+
+
+def decode_json(response: Response) -> Any:
+    return response.json()
+
+
+def record_decoder(path: str, stream=False, loads: Decoder | None = None):
+    """Returns a page decoder that selects the records at ``path``.
+
+    When streaming, the records are parsed while the body downloads and the
+    decoder returns a lazy iterator, otherwise a list of records.
+
+    :param loads: (optional) Decodes the body bytes, instead of
+        ``response.json()``. Not used when streaming.
+    """
+    steps = parse_path(path)
+    if stream:
+
+        def decode(response):
+            return iter_records(response.iter_content(STREAM_CHUNK_SIZE), steps)
+
+    elif loads:
+
+        def decode(response):
+            return extract_records(loads(response.content), steps)
+
+    else:
+
+        def decode(response):
+            return extract_records(response.json(), steps)
+
+    return decode
+
+
+def transformed(decode, transform):
+    def decode_and_transform(response):
+        return transform(decode(response))
+
+    return decode_and_transform
+
+
+def page_decoder(
+    records: str | None = None, stream=False, decoder: Decoder | None = None
+):
+    """Returns the function that turns a response into what ingest yields.
+
+    ``decoder=bytes`` or ``decoder=memoryview`` yields the body undecoded.
+    """
+    if decoder in (bytes, memoryview):
+        if records is not None:
+            raise ValueError("records cannot be selected from undecoded bodies")
+
+        def decode(response):
+            return decoder(response.content)
+
+        return decode
+    if records is not None:
+        return record_decoder(records, stream=stream, loads=decoder)
+    if decoder:
+
+        def decode(response):
+            return decoder(response.content)
+
+        return decode
+    return decode_json
+
+
 def ingest(
     method,
     url,
@@ -161,7 +456,27 @@ def ingest(
     next_page=next_page,
     authenticate=None,
     rate_limit=None,
-):
+    prefetch: int = 0,
+    session: Session | None = None,
+    pool: PoolConfig | None = None,
+    records: str | None = None,
+    batch_size: int | None = None,
+    checkpoint: Checkpoint | None = None,
+    resume: bool = False,
+    instrument: Subscriber | list[Subscriber] | None = None,
+    cache: ResponseCache | None = None,
+    decoder: Decoder | None = None,
+    accept_encoding: bool | str | None = None,
+    dedup: Deduplicator | None = None,
+    transform: Callable[[Any], Any] | None = None,
+    decode_processes: int | Executor = 0,
+    page_size: PageSizeTuner | None = None,
+    errors: ErrorPolicy | None = None,
+    watermark: Watermark | None = None,
+    lookahead: int = 0,
+    budget: MemoryBudget | None = None,
+    columns: Projection | None = None,
+) -> Generator[Any, None, None]:
     """Constructs a :class:`Request <Request>`, prepares it and sends it.
     Returns :class:`Response <Response>` object.
 
@@ -203,53 +518,445 @@ def ingest(
         may be useful during local development or testing.
     :param cert: (optional) if String, path to ssl client cert file (.pem).
         If Tuple, ('cert', 'key') pair.
+    :param authenticate: (optional) Hook called before every request, or a
+        :class:`TokenProvider` that caches the token until it expires.
+    :param rate_limit: (optional) Hook called before every request, or a
+        :class:`RateLimiter` that paces the requests per host and adapts to
+        the rate limit headers of the responses. A
+        :class:`SharedRateLimiter` paces all processes on the host together.
+    :param prefetch: (optional) Declares that ``next_page`` does not depend
+        on the response, as with offset or page number pagination, and
+        fetches up to this many pages concurrently. Pages are still yielded
+        in order and fetching stops at the first invalid or empty page.
+    :param session: (optional) :class:`Session` to send the requests with,
+        so connections are reused across ingest runs, see
+        :func:`make_session`. The session is not closed and ``retries`` and
+        ``pool`` must be configured on it by the caller.
+    :param pool: (optional) :class:`PoolConfig` for the session ingest
+        creates. Defaults to a pool that fits ``prefetch`` connections.
+    :param records: (optional) Path of the records in a page, such as
+        ``data.items[*]``, to yield the records instead of the pages. With
+        ``stream=True`` the records are parsed while the page downloads, so
+        memory stays bounded by the largest record instead of the page. The
+        ``next_page`` hook then runs after the body has been consumed and
+        should only use the headers of the response.
+    :param batch_size: (optional) Yield lists of this many records instead
+        of single records, the last batch may be shorter.
+    :param checkpoint: (optional) :class:`Checkpoint` that periodically
+        records the ``next_page`` state and the page count, such as a
+        :class:`FileCheckpoint` or :class:`SQLiteCheckpoint`. It is saved
+        when the run stops early and cleared when the run completes.
+    :param resume: Restart from the state saved in ``checkpoint``, from the
+        first page that was not consumed, instead of from the first page.
+    :param instrument: (optional) Callable, or list of callables, that
+        receives a :class:`PageEvent` with the latency, time to first byte,
+        size, decode time, hook times and retries of every response, such as
+        a :class:`LoggingSubscriber` or :class:`MetricsRegistry`. Without it
+        nothing is measured.
+    :param cache: (optional) :class:`ResponseCache` that sends conditional
+        requests and answers ``304 Not Modified`` responses from disk.
+    :param decoder: (optional) Callable that decodes the body bytes instead
+        of ``response.json()``, such as ``orjson.loads``, see
+        :func:`fastest_loads`. ``bytes`` or ``memoryview`` yield the bodies
+        without decoding them.
+    :param accept_encoding: (optional) The content codings to accept, True
+        for all that are installed, including zstd and br, False for
+        uncompressed bodies or the ``Accept-Encoding`` header value.
+    :param dedup: (optional) :class:`Deduplicator` that drops records whose
+        key was seen before, such as the records that shifted onto the next
+        page while paginating by offset. Requires ``records``.
+    :param transform: (optional) Function applied to every decoded page, or
+        to the list of records of a page with ``records``.
+    :param decode_processes: (optional) Decode the pages and run
+        ``transform`` in this many worker processes, or in a process pool
+        :class:`Executor`, while the next pages are fetched. The pages are
+        still yielded in order. ``decoder`` and ``transform`` must then be
+        picklable and the records are not streamed.
+    :param page_size: (optional) :class:`PageSizeTuner` that sets the page
+        size parameter and adapts it to the observed throughput, and
+        optionally keeps the offsets in step with the sizes.
+    :param errors: (optional) :class:`ErrorPolicy` that retries failed pages
+        in place, honouring ``Retry-After``, and picks which statuses are
+        accepted, end the stream or raise. Without it only 200 is accepted
+        and anything else ends the stream.
+    :param watermark: (optional) :class:`Watermark`, such as a
+        :class:`FileWatermark`, that merges the watermark of the last run
+        into the first request and stores the new one once this run has
+        yielded every page.
+    :param lookahead: (optional) Drive the requests and ``next_page`` on a
+        producer thread that runs up to this many pages ahead of the
+        consumer, so the network time overlaps with processing the pages,
+        also when ``next_page`` depends on the response.
+    :param budget: (optional) :class:`MemoryBudget` shared with other
+        ingests, new requests wait while the response bodies in flight
+        exceed it.
+    :param columns: (optional) :class:`Projection` that turns every batch
+        of ``batch_size`` records into a dict of columns of the projected
+        fields.
     :rtype: requests.Response
     """
     request_input_args = reduce(filter_request_input, locals().items(), {})
 
-    check_is_function(next_page)
-    if authenticate:
-        check_is_function(authenticate)
-    if rate_limit:
-        check_is_function(rate_limit)
-    reauth_dict = None
-    ratelimit_dict = None
-    response = None
-    session = Session()
-    if retries:
-        session.mount("http://", HTTPAdapter(max_retries=retries))
-    next_page_dict = next_page()
-    while next_page_dict:
-        request_input_args = update_args(
-            validate_keys(next_page_dict), request_input_args
+    probe = Probe(instrument, stream=bool(stream)) if instrument else None
+    plan = RequestPlan(
+        request_input_args,
+        next_page,
+        authenticate,
+        rate_limit,
+        probe,
+        page_size,
+        validate=errors and errors.validate,
+    )
+    if accept_encoding is not None:
+        plan.merge(
+            {"headers": {"Accept-Encoding": accept_encoding_header(accept_encoding)}}
         )
-        print(request_input_args)
+    if dedup and records is None:
+        raise ValueError("dedup requires records")
+    if columns and (records is None or not batch_size):
+        raise ValueError("columns requires records and batch_size")
+    if resume and checkpoint is None:
+        raise ValueError("resume requires a checkpoint")
+    if checkpoint and page_size and page_size.offset_param:
+        raise ValueError("checkpoint cannot resume offsets set by a PageSizeTuner")
+    if watermark and decode_processes and prefetch:
+        raise ValueError("watermark cannot tell when decode_processes completed")
+    if watermark:
+        watermark_args = watermark.start()
+        if watermark_args:
+            plan.merge(watermark_args)
+    if lookahead and checkpoint:
+        raise ValueError("checkpoint cannot be combined with lookahead")
+    if decode_processes:
+        if checkpoint:
+            raise ValueError("checkpoint cannot be combined with decode_processes")
+        decode = page_decoder(decoder=bytes)
+    else:
+        decode = page_decoder(records, stream=bool(stream), decoder=decoder)
+        if transform:
+            decode = transformed(decode, transform)
+    owns_session = session is None
+    if owns_session:
+        if pool is None:
+            pool = PoolConfig(pool_maxsize=max(prefetch, DEFAULT_POOLSIZE))
+        session = make_session(retries=retries, pool=pool)
+    elif retries or pool:
+        raise ValueError(
+            "retries and pool must be configured on the session that is passed in"
+        )
+    tracker = checkpoint and CheckpointTracker(checkpoint, resume=resume)
+    send = make_sender(session, probe, cache, errors, budget, page_size)
+    # Pages queued for lookahead or decoding keep their bytes in flight
+    # until the consumer takes them, their responses travel along in held.
+    held = deque() if budget and (lookahead or decode_processes) else None
+    fetched = deque() if held is not None and lookahead else held
+    if prefetch:
+        page_iter = prefetch_pages(
+            send, plan, prefetch, decode, tracker, probe, budget, fetched
+        )
+    else:
+        page_iter = pages(send, plan, decode, tracker, probe, budget, fetched)
+    if lookahead:
+        page_iter = lookahead_pages(page_iter, lookahead, fetched, held)
+    if decode_processes:
+        page_iter = decode_pages(
+            page_iter,
+            decode_processes,
+            loads=decoder,
+            steps=None if records is None else parse_path(records),
+            transform=transform,
+            stop_at_empty=bool(prefetch),
+            held=held,
+            budget=budget,
+        )
+    if held is not None:
+        page_iter = release_consumed(page_iter, held)
+    try:
+        if records is None:
+            item_iter = page_iter
+        else:
+            item_iter = chain.from_iterable(page_iter)
+            if dedup:
+                item_iter = filterfalse(dedup.seen, item_iter)
+        if watermark:
+            item_iter = watermark.observe(item_iter)
+        if batch_size and records is not None:
+            for batch in batched(item_iter, batch_size):
+                yield columns(batch) if columns else list(batch)
+        else:
+            yield from item_iter
+        if watermark and plan.completed:
+            watermark.commit()
+    finally:
+        page_iter.close()
+        if owns_session:
+            session.close()
+
+
+def make_sender(
+    session: Session,
+    probe: Probe | None = None,
+    cache: ResponseCache | None = None,
+    errors: ErrorPolicy | None = None,
+    budget: MemoryBudget | None = None,
+    page_size: PageSizeTuner | None = None,
+):
+    """Returns a function that sends the request for the merged arguments
+    and returns the response with its latency, None without a probe."""
+    request = session.request
+    if cache:
+        request = partial(cache.request, session)
+
+    def send_request(request_input_args):
+        return request(**request_input_args), None
+
+    send = send_request
+    if errors:
+        send = partial(errors.send, send)
+    if probe:
+        send = partial(probe.send, send)
+    if budget:
+        send = partial(budget.send, send)
+    if page_size:
+        send = partial(page_size.send, send)
+    return send
+
+
+def pages(
+    send,
+    plan: RequestPlan,
+    decode,
+    tracker: CheckpointTracker | None = None,
+    probe: Probe | None = None,
+    budget: MemoryBudget | None = None,
+    held: deque[Response] | None = None,
+) -> Generator[Any, None, None]:
+    """Fetches the pages one after another, every ``next_page`` call sees
+    the response of the page before it.
+
+    :param held: (optional) Append the response of every yielded page here
+        instead of releasing its budget, for a later stage to release.
+    """
+    response = handed_off = None
+    stream = bool(plan.args.get("stream"))
+    next_page_dict = tracker.start(plan.next_page) if tracker else plan.next_page()
+    try:
+        while next_page_dict:
+            request_input_args = plan.prepare(next_page_dict, response=response)
+
+            if budget:
+                budget.wait()
+            response, latency = send(request_input_args)
+            if response.status_code == 401:
+                retry_args = plan.reauthenticate(response, request_input_args)
+                if retry_args:
+                    release_response(response)
+                    response, latency = send(retry_args)
+
+            if plan.validate(response):
+                if empty_response(response, stream):
+                    # An accepted response without a body ends the stream,
+                    # as it does with prefetch.
+                    if probe:
+                        probe.emit(response, latency)
+                    next_page_dict = None
+                    break
+                # If the response is valid, we can proceed to the next page
+                if held is not None:
+                    held.append(response)
+                    handed_off = response
+                if probe:
+                    yield probe.page(decode, response, latency)
+                else:
+                    yield decode(response)
+                if held is None:
+                    release_response(response)
+
+                next_page_dict = plan.next_page(next_page_dict, response=response)
+                if tracker:
+                    tracker.consumed(tracker.advance(next_page_dict))
+            else:
+                if probe:
+                    probe.emit(response, latency)
+                break
+    except BaseException:
+        if tracker:
+            tracker.save()
+        raise
+    finally:
+        if response is not handed_off:
+            release_response(response)
+    plan.completed = not next_page_dict
+    if tracker:
+        if next_page_dict:
+            tracker.save()
+        else:
+            tracker.finish()
 
-        if authenticate:
-            authenticate_args, reauth_dict = authenticate(
-                reauth_dict=reauth_dict, response=response
-            )
-            if authenticate_args:
-                request_input_args = update_args(
-                    validate_keys(authenticate_args), request_input_args
-                )
-        if rate_limit:
-            ratelimit_dict = rate_limit(
-                ratelimit_dict=ratelimit_dict, response=response
-            )
 
-        response = session.request(
-            **request_input_args,
-        )
+# Marks an exhausted page iterator.
+EMPTY = object()
 
-        if validate_response(response):
-            # If the response is valid, we can proceed to the next page
-            print("Valid response received.")
-            next_page_dict = next_page(next_page_dict, response=response)
 
-            yield response.json()
+def snapshot_args(request_input_args):
+    """Copies the dict values of the merged arguments, later in place merges
+    would otherwise change requests that are already scheduled."""
+    return {
+        key: value.copy() if isinstance(value, dict) else value
+        for key, value in request_input_args.items()
+    }
+
+
+def release_sent(future: Future[tuple[Response, float | None]]):
+    """Releases the response of a request that was scheduled but not used."""
+    if not future.cancelled() and future.exception() is None:
+        release_response(future.result()[0])
+
+
+def prefetch_pages(
+    send,
+    plan: RequestPlan,
+    prefetch,
+    decode,
+    tracker: CheckpointTracker | None = None,
+    probe: Probe | None = None,
+    budget: MemoryBudget | None = None,
+    held: deque[Response] | None = None,
+) -> Generator[Any, None, None]:
+    """Fetches up to ``prefetch`` pages concurrently and yields them in order.
+
+    ``next_page`` is called with ``response=None`` so the request dicts can
+    be computed ahead of the responses. The authenticate and rate_limit hooks
+    run when a request is scheduled and see the latest response that came
+    back. The lookahead stops at the first invalid or empty page, requests
+    scheduled beyond it are cancelled or discarded. With a ``budget``, no
+    more requests are scheduled while it is exhausted.
+
+    :param held: (optional) Append the response of every yielded page here
+        instead of releasing its budget, for a later stage to release.
+    """
+    response = handed_off = None
+    stream = bool(plan.args.get("stream"))
+    pending = deque()
+    next_page_dict = tracker.start(plan.next_page) if tracker else plan.next_page()
+    completed = False
+    with ThreadPoolExecutor(max_workers=prefetch) as executor:
+        try:
+            while next_page_dict or pending:
+                while next_page_dict and len(pending) < prefetch:
+                    # Only wait with nothing pending, the pending pages may
+                    # be what exhausts the budget.
+                    if budget and not budget.wait(block=not pending):
+                        break
+                    request_input_args = snapshot_args(
+                        plan.prepare(next_page_dict, response=response)
+                    )
+                    future = executor.submit(send, request_input_args)
+                    next_page_dict = plan.next_page(next_page_dict, response=None)
+                    cursor = tracker.advance(next_page_dict) if tracker else None
+                    pending.append((request_input_args, future, cursor))
+
+                request_input_args, future, cursor = pending.popleft()
+                response, latency = future.result()
+                if response.status_code == 401:
+                    retry_args = plan.reauthenticate(response, request_input_args)
+                    if retry_args:
+                        release_response(response)
+                        response, latency = send(retry_args)
+                if not plan.validate(response):
+                    if probe:
+                        probe.emit(response, latency)
+                    break
+                if empty_response(response, stream):
+                    page = None
+                    if probe:
+                        probe.emit(response, latency)
+                elif probe:
+                    page = probe.page(decode, response, latency)
+                else:
+                    page = decode(response)
+                if isinstance(page, Iterator):
+                    first = next(page, EMPTY)
+                    if first is EMPTY:
+                        completed = True
+                        break
+                    page = chain((first,), page)
+                elif not page:
+                    completed = True
+                    break
+                if held is not None:
+                    held.append(response)
+                    handed_off = response
+                yield page
+                if held is None:
+                    release_response(response)
+                if tracker:
+                    tracker.consumed(cursor)
+            else:
+                completed = True
+        except BaseException:
+            if tracker:
+                tracker.save()
+            raise
+        finally:
+            if response is not handed_off:
+                release_response(response)
+            for _request_input_args, future, _cursor in pending:
+                if not future.cancel():
+                    future.add_done_callback(release_sent)
+    plan.completed = completed
+    if tracker:
+        if completed:
+            tracker.finish()
         else:
-            print(f"Error: {response.status_code}")
-            break
-    session.close()
-    # add logging options
+            tracker.save()
+
+
+def lookahead_pages(
+    page_iter,
+    depth: int,
+    fetched: deque[Response] | None = None,
+    held: deque[Response] | None = None,
+) -> Generator[Any, None, None]:
+    """Drives ``page_iter`` on a producer thread, up to ``depth`` pages ahead
+    of the consumer.
+
+    The producer keeps sending requests and calling ``next_page`` while the
+    consumer processes the pages it already received, errors are raised in
+    the consumer. Closing the generator stops the producer once its current
+    request finished and closes ``page_iter`` on the producer thread.
+
+    :param fetched: (optional) Where ``page_iter`` appends the response of
+        every page it yields, the responses travel with the pages.
+    :param held: (optional) Where the responses are appended again on the
+        consumer thread, for a later stage to release.
+    """
+    handoff = Handoff(depth)
+
+    def produce():
+        try:
+            for page in page_iter:
+                response = fetched.popleft() if fetched is not None else None
+                if not handoff.put((None, page, response)):
+                    return
+            handoff.put((DONE, None, None))
+        except Exception as error:
+            handoff.put((FAILED, error, None))
+        finally:
+            page_iter.close()
+
+    producer = threading.Thread(target=produce, name="inquestor-lookahead", daemon=True)
+    producer.start()
+    try:
+        while True:
+            marker, page, response = handoff.get()
+            if marker is DONE:
+                return
+            if marker is FAILED:
+                raise page
+            if held is not None:
+                held.append(response)
+            yield page
+    finally:
+        handoff.close()
+        producer.join()
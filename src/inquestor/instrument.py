@@ -0,0 +1,212 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+from requests import Response
+
+type Subscriber = Callable[["PageEvent"], None]
+
+
+@dataclass(slots=True)
+class PageEvent:
+    """Measurements of one page, all durations in seconds.
+
+    :param latency: From sending the first attempt of the request until the
+        body was received, or until the headers were received when the body
+        is streamed.
+    :param ttfb: Time to first byte, until the response headers were parsed.
+    :param bytes: Body bytes received, the ``Content-Length`` when streamed.
+    :param decode: Time spent decoding the page. Streamed records are
+        decoded while they are consumed, which is not included.
+    :param hooks: Time spent in each hook since the previous page.
+    :param retries: Number of retries the transport and the
+        :class:`ErrorPolicy` made for this page.
+    """
+
+    url: str
+    status: int
+    latency: float
+    ttfb: float
+    bytes: int
+    decode: float
+    hooks: dict[str, float] = field(default_factory=dict)
+    retries: int = 0
+
+
+class Probe:
+    """Takes the measurements of one ingest run for its subscribers.
+
+    Only created when somebody subscribed, an ingest without
+    ``instrument`` runs no timing code at all.
+    """
+
+    def __init__(self, subscribers: Subscriber | Sequence[Subscriber], stream=False):
+        if callable(subscribers):
+            subscribers = [subscribers]
+        self.subscribers = list(subscribers)
+        self.stream = stream
+        self.hooks: defaultdict[str, float] = defaultdict(float)
+
+    def timed(self, name: str, func):
+        """Wraps ``func`` so its duration is added to the hook times."""
+        hooks = self.hooks
+
+        def timed_func(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hooks[name] += time.perf_counter() - start
+
+        return timed_func
+
+    def send(self, send, request_input_args) -> tuple[Response, float]:
+        """Sends the request with ``send`` and measures its latency, over
+        all attempts when ``send`` retries."""
+        start = time.perf_counter()
+        response = send(request_input_args)[0]
+        return response, time.perf_counter() - start
+
+    def page(self, decode, response: Response, latency: float):
+        """Decodes the page and publishes its :class:`PageEvent`."""
+        start = time.perf_counter()
+        page = decode(response)
+        self.emit(response, latency, time.perf_counter() - start)
+        return page
+
+    def emit(self, response: Response, latency: float, decode: float = 0.0):
+        if self.stream:
+            received = int(response.headers.get("Content-Length", 0))
+        else:
+            received = len(response.content)
+        history = getattr(getattr(response.raw, "retries", None), "history", ())
+        event = PageEvent(
+            url=response.url,
+            status=response.status_code,
+            latency=latency,
+            ttfb=response.elapsed.total_seconds(),
+            bytes=received,
+            decode=decode,
+            hooks=dict(self.hooks),
+            retries=len(history) + getattr(response, "policy_retries", 0),
+        )
+        self.hooks.clear()
+        for subscriber in self.subscribers:
+            subscriber(event)
+
+
+class LoggingSubscriber:
+    """Logs every :class:`PageEvent`, by default at debug level."""
+
+    def __init__(self, logger: logging.Logger | None = None, level=logging.DEBUG):
+        self.logger = logger or logging.getLogger("inquestor")
+        self.level = level
+
+    def __call__(self, event: PageEvent):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(
+                self.level,
+                "%s %s %d bytes in %.3fs (ttfb %.3fs, decode %.3fs, retries %d)",
+                event.status,
+                event.url,
+                event.bytes,
+                event.latency,
+                event.ttfb,
+                event.decode,
+                event.retries,
+            )
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """In-process Prometheus style registry fed by :class:`PageEvent`.
+
+    Counts pages, bytes, retries and responses per status code, and keeps
+    histograms of the latency, time to first byte, decode time and hook
+    times. :meth:`render` returns the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix: str = "inquestor", buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.pages = 0
+        self.bytes = 0
+        self.retries = 0
+        self.statuses = Counter()
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name: str, value: float, label: str = ""):
+        key = (name, label)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(self.buckets)
+        self.histograms[key].observe(value)
+
+    def __call__(self, event: PageEvent):
+        with self.lock:
+            self.pages += 1
+            self.bytes += event.bytes
+            self.retries += event.retries
+            self.statuses[event.status] += 1
+            self.observe("latency_seconds", event.latency)
+            self.observe("ttfb_seconds", event.ttfb)
+            self.observe("decode_seconds", event.decode)
+            for hook, seconds in event.hooks.items():
+                self.observe("hook_seconds", seconds, hook)
+
+    def render(self) -> str:
+        prefix = self.prefix
+        with self.lock:
+            lines = [
+                f"# TYPE {prefix}_pages_total counter",
+                f"{prefix}_pages_total {self.pages}",
+                f"# TYPE {prefix}_bytes_total counter",
+                f"{prefix}_bytes_total {self.bytes}",
+                f"# TYPE {prefix}_retries_total counter",
+                f"{prefix}_retries_total {self.retries}",
+                f"# TYPE {prefix}_responses_total counter",
+            ]
+            lines += [
+                f'{prefix}_responses_total{{status="{status}"}} {count}'
+                for status, count in sorted(self.statuses.items())
+            ]
+            typed = set()
+            for (name, label), histogram in sorted(self.histograms.items()):
+                metric = f"{prefix}_{name}"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                labels = f'hook="{label}",' if label else ""
+                cumulative = 0
+                for bound, count in zip(
+                    (*histogram.buckets, "+Inf"), histogram.counts, strict=True
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{metric}_bucket{{{labels}le="{bound}"}} {cumulative}'
+                    )
+                suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+                lines.append(f"{metric}_sum{suffix} {histogram.sum}")
+                lines.append(f"{metric}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
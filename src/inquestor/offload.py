@@ -0,0 +1,95 @@
+import json
+import os
+from collections import deque
+from collections.abc import Callable, Generator
+from concurrent.futures import Executor
+from typing import Any
+
+from requests import Response
+
+from .budget import MemoryBudget, release_response
+from .records import extract_records
+from .workers import spawn_pool
+
+
+def decode_body(
+    body: bytes,
+    loads: Callable[[bytes], Any] | None = None,
+    steps: tuple[str | None, ...] | None = None,
+    transform: Callable[[Any], Any] | None = None,
+) -> Any:
+    """Decodes a page body in a worker process, selects the records at
+    ``steps`` and applies ``transform``."""
+    page = (loads or json.loads)(body)
+    if steps is not None:
+        page = extract_records(page, steps)
+    if transform:
+        page = transform(page)
+    return page
+
+
+def decode_pages(
+    bodies: Generator[bytes, None, None],
+    processes: int | Executor,
+    loads: Callable[[bytes], Any] | None = None,
+    steps: tuple[str | None, ...] | None = None,
+    transform: Callable[[Any], Any] | None = None,
+    stop_at_empty: bool = False,
+    held: deque[Response] | None = None,
+    budget: MemoryBudget | None = None,
+) -> Generator[Any, None, None]:
+    """Decodes the page bodies in a process pool and yields them in order.
+
+    Up to two pages per process are decoded ahead, while the next bodies are
+    fetched by the caller's thread.
+
+    :param processes: Number of worker processes to start, or an
+        :class:`Executor` to reuse, which is not shut down.
+    :param stop_at_empty: Stop at the first page that decodes to nothing,
+        as prefetching does for the pages it decodes itself. The bodies
+        fetched beyond it while decoding ahead are discarded.
+    :param held: (optional) Where ``bodies`` appends the response of every
+        body, it is appended again when its page is yielded, for a later
+        stage to release.
+    :param budget: (optional) :class:`MemoryBudget` of the bodies, no more
+        bodies are read ahead while it is exhausted.
+    """
+    if isinstance(processes, Executor):
+        executor, owned = processes, False
+        window = 2 * (os.cpu_count() or 1)
+    else:
+        executor = spawn_pool(processes)
+        owned, window = True, 2 * processes
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < window:
+                # Only read ahead within the budget, fetching the next body
+                # would wait for the bodies pending here.
+                if budget and pending and not budget.wait(block=False):
+                    break
+                body = next(bodies, None)
+                if body is None:
+                    exhausted = True
+                else:
+                    response = held.popleft() if held is not None else None
+                    future = executor.submit(decode_body, body, loads, steps, transform)
+                    pending.append((future, response))
+            if not pending:
+                return
+            future, response = pending.popleft()
+            page = future.result()
+            if stop_at_empty and not page:
+                release_response(response)
+                return
+            if held is not None:
+                held.append(response)
+            yield page
+    finally:
+        for future, response in pending:
+            future.cancel()
+            release_response(response)
+        bodies.close()
+        if owned:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,221 @@
+import math
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import closing
+from itertools import pairwise
+from multiprocessing import get_context
+from queue import Empty
+from typing import Any, NamedTuple
+
+from .fanout import IngestResult
+from .inquestor import ingest
+from .workers import DONE, FAILED, Handoff, spawn_pool
+
+
+class Shard(NamedTuple):
+    """A half-open ``[start, stop)`` part of a partitioned range."""
+
+    start: Any
+    stop: Any
+
+
+def split_range(start, stop, parts: int) -> list[Shard]:
+    """Splits ``[start, stop)`` into up to ``parts`` equal shards.
+
+    Works for ints, floats and anything with a linear difference such as
+    datetimes; int shards are never empty.
+    """
+    parts = max(parts, 1)
+    span = stop - start
+    if isinstance(span, int):
+        bounds = [start + span * part // parts for part in range(parts + 1)]
+    else:
+        bounds = [start + span * part / parts for part in range(parts)] + [stop]
+    return [Shard(low, high) for low, high in pairwise(bounds) if low < high]
+
+
+def put_pages(results: Handoff, shard: Shard, pages) -> bool:
+    return all(results.put((None, shard, page)) for page in pages)
+
+
+def ingest_shard(
+    results: Handoff,
+    method,
+    url,
+    kwargs: dict[str, Any],
+    shard: Shard,
+    split_after: int | None = None,
+    position: Callable[[Any], Any] | None = None,
+) -> Any:
+    """Ingests one shard in a worker thread or process and puts its pages on
+    ``results`` as they arrive.
+
+    With ``split_after`` the first pages are held back until the shard is
+    either cut off at the position of its ``split_after``-th page, and the
+    pages are tagged with the shortened shard, or known to continue.
+
+    :return: Where the shard was cut off, or None when the shard was
+        ingested completely or the consumer stopped.
+    """
+    with closing(ingest(method, url, **kwargs)) as shard_pages:
+        held = []
+        if split_after and position is not None:
+            for page in shard_pages:
+                held.append(page)
+                if len(held) < split_after:
+                    continue
+                resume = position(page)
+                if resume is not None and shard.start < resume < shard.stop:
+                    put_pages(results, Shard(shard.start, resume), held)
+                    return resume
+                break
+        if not put_pages(results, shard, held):
+            return None
+        for page in shard_pages:
+            if not put_pages(results, shard, (page,)):
+                return None
+    return None
+
+
+def run_shard(
+    results: Handoff,
+    method,
+    url,
+    kwargs: dict[str, Any],
+    shard: Shard,
+    split_after: int | None = None,
+    position: Callable[[Any], Any] | None = None,
+):
+    """Runs :func:`ingest_shard` and puts a ``DONE`` marker with where the
+    shard was cut off, or a ``FAILED`` marker with the error, after its
+    pages. The markers are put by the worker itself, so the consumer never
+    puts on the queue it drains."""
+    try:
+        resume = ingest_shard(
+            results, method, url, kwargs, shard, split_after, position
+        )
+    except Exception as error:
+        results.put((FAILED, shard, error))
+    else:
+        results.put((DONE, shard, resume))
+
+
+def merge_kwargs(kwargs: dict[str, Any], overrides: dict[str, Any]) -> dict[str, Any]:
+    """Merges ``overrides`` over ``kwargs`` like :func:`merge_args` does, dict
+    values are merged, into a new dict so the shards share no dicts."""
+    merged = dict(kwargs)
+    for key, value in overrides.items():
+        current = merged.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            value = current | value
+        merged[key] = value
+    return merged
+
+
+def resplit(shard: Shard, resume, limit: int) -> list[Shard]:
+    """Splits what remains of a cut off shard by the density seen so far,
+    into about as many shards as ``[shard.start, resume)`` fit in it.
+
+    :param limit: Maximum number of shards to split into.
+    """
+    ratio = (shard.stop - resume) / (resume - shard.start)
+    return split_range(resume, shard.stop, min(math.ceil(ratio), limit))
+
+
+def ingest_partitioned(
+    method,
+    url,
+    start,
+    stop,
+    partition: Callable[[Any, Any], dict[str, Any]],
+    workers: int = 4,
+    shards: int | None = None,
+    processes: bool = False,
+    split_after: int | None = None,
+    position: Callable[[Any], Any] | None = None,
+    buffer: int | None = None,
+    **kwargs,
+) -> Iterator[IngestResult]:
+    """Ingests ``[start, stop)`` as independent shards in parallel.
+
+    The range, such as ids or datetimes, is split into ``shards`` parts and
+    every part is ingested on its own with the arguments ``partition``
+    returns for it, so even cursor paginated feeds are fetched in parallel.
+    Pages are yielded as the shards fetch them, each tagged with its
+    :class:`Shard` as source, and the shards pause while ``buffer`` pages
+    wait to be consumed, so memory does not grow with the size of a shard.
+
+    Shards whose size was underestimated are rebalanced when ``position``
+    is given: once a shard fetched ``split_after`` pages it is cut off at
+    the position of its last page, and the rest of its range is split by
+    the page density seen so far and scheduled as new shards.
+
+    :param partition: Returns the :func:`ingest` arguments that limit the
+        feed to ``[low, high)``, e.g. ``{"params": {"since": low, "until":
+        high}}``. They are merged over ``kwargs``, dict values such as
+        ``params`` key by key.
+    :param workers: Number of shards ingested at once.
+    :param shards: Initial number of shards, four per worker by default so
+        uneven shards balance out.
+    :param processes: Ingest the shards in worker processes instead of
+        threads, for CPU bound decoding. The hooks and arguments must then
+        be picklable.
+    :param split_after: (optional) Pages after which a shard is cut off.
+    :param position: (optional) Returns where the range continues after a
+        page, e.g. the last id plus one, for feeds sorted on the range.
+    :param buffer: (optional) Maximum number of fetched pages waiting to be
+        consumed, ``2 * workers`` by default.
+    :param kwargs: Any other :func:`ingest` argument.
+    """
+    manager = None
+    if processes:
+        manager = get_context("spawn").Manager()
+        executor: Executor = spawn_pool(workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+    results = Handoff(buffer or 2 * workers, manager)
+    submitted = []
+
+    def schedule(shard: Shard):
+        shard_kwargs = merge_kwargs(kwargs, partition(shard.start, shard.stop))
+        submitted.append(
+            executor.submit(
+                run_shard,
+                results,
+                method,
+                url,
+                shard_kwargs,
+                shard,
+                split_after,
+                position,
+            )
+        )
+
+    try:
+        for shard in split_range(start, stop, shards or workers * 4):
+            schedule(shard)
+        reported = 0
+        while reported < len(submitted):
+            try:
+                marker, shard, value = results.get(timeout=0.5)
+            except Empty:
+                # A worker that could not run at all, such as in a broken
+                # process pool, puts no marker.
+                for future in submitted:
+                    if future.done() and future.exception():
+                        raise future.exception() from None
+                continue
+            if marker is FAILED:
+                raise value
+            if marker is DONE:
+                reported += 1
+                if value is not None:
+                    for part in resplit(shard, value, workers):
+                        schedule(part)
+            else:
+                yield IngestResult(shard, value)
+    finally:
+        results.close()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if manager:
+            manager.shutdown()
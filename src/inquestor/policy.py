@@ -0,0 +1,132 @@
+import logging
+import random
+import time
+from collections.abc import Callable, Collection
+from enum import Enum
+
+from requests import HTTPError, Response
+from requests.exceptions import ConnectionError, Timeout
+
+from .ratelimit import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class Action(Enum):
+    accept = "accept"
+    retry = "retry"
+    stop = "stop"
+    raise_ = "raise"
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class ErrorPolicy:
+    """What :func:`ingest` does with each response status.
+
+    Pass it as ``errors=`` to ingest. Statuses to retry are sent again in
+    place, after a jittered exponential backoff or the ``Retry-After`` delay
+    the server asked for, so the stream carries on from the page that
+    failed. Accepted statuses are yielded, on ``stop`` the stream ends as it
+    does without a policy and on ``raise`` an :class:`HTTPError` is raised.
+
+    :param statuses: Action per status code, e.g. ``{404: "stop"}``, on top
+        of the defaults: 2xx are accepted, 429 and 5xx gateway errors are
+        retried and everything else stops the stream.
+    :param max_attempts: Attempts per page before ``exhausted`` applies.
+    :param backoff: Base delay in seconds, doubled for every attempt.
+    :param max_backoff: Upper bound of the backoff and Retry-After delays.
+    :param exhausted: Action once the attempts of a page run out, ``raise``
+        or ``stop``.
+    :param retry_exceptions: Connection errors to retry like a status.
+    :param sleep: Sleep function, for tests.
+    """
+
+    def __init__(
+        self,
+        statuses: dict[int, str | Action] | None = None,
+        max_attempts: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        exhausted: str | Action = Action.raise_,
+        retry_exceptions: Collection[type[Exception]] = (ConnectionError, Timeout),
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.statuses = {
+            status: Action(action) for status, action in (statuses or {}).items()
+        }
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.exhausted = Action(exhausted)
+        self.retry_exceptions = tuple(retry_exceptions)
+        self.sleep = sleep
+
+    def action(self, status: int) -> Action:
+        if status in self.statuses:
+            return self.statuses[status]
+        if 200 <= status < 300:
+            return Action.accept
+        if status in RETRY_STATUSES:
+            return Action.retry
+        return Action.stop
+
+    def validate(self, response: Response) -> bool:
+        """Replaces :func:`validate_response` for the accepted statuses."""
+        if self.action(response.status_code) is Action.accept:
+            return True
+        logger.warning("Stopping at status code: %s", response.status_code)
+        return False
+
+    def delay(self, attempt: int, response: Response | None = None) -> float:
+        """Seconds to wait after failed ``attempt``, counting from 1, with full
+        jitter unless the response carries ``Retry-After``."""
+        if response is not None and "Retry-After" in response.headers:
+            retry_after = parse_retry_after(
+                response.headers["Retry-After"], time.time()
+            )
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        )
+
+    def send(self, send, request_input_args):
+        """Sends the request with ``send``, retrying it as the policy says.
+
+        :return: What ``send`` returned for the last attempt. Its response
+            has a ``policy_retries`` attribute with the number of retries.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            last = attempt >= self.max_attempts
+            try:
+                sent = send(request_input_args)
+            except self.retry_exceptions as error:
+                if last:
+                    raise
+                delay = self.delay(attempt)
+                logger.warning("Retrying in %.2fs after %r", delay, error)
+                self.sleep(delay)
+                continue
+            response = sent[0]
+            action = self.action(response.status_code)
+            if action is Action.retry and last:
+                action = self.exhausted
+            if action is Action.raise_:
+                raise HTTPError(
+                    f"{response.status_code} after {attempt} attempt(s) for "
+                    f"{response.url}",
+                    response=response,
+                )
+            if action is not Action.retry:
+                setattr(response, "policy_retries", attempt - 1)
+                return sent
+            delay = self.delay(attempt, response)
+            logger.warning(
+                "Retrying in %.2fs after status code %s", delay, response.status_code
+            )
+            response.close()
+            self.sleep(delay)
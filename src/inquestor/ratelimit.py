@@ -0,0 +1,249 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# X-RateLimit-Reset values above this are epoch timestamps, not seconds.
+EPOCH_THRESHOLD = 1_000_000_000
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations.
+
+    Tokens may go negative: the debt is the time the latest reservation has
+    to wait before it may send its request.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Takes one token and returns how long to wait before using it."""
+        self.refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def block(self, now: float, until: float):
+        """Makes the next reservation wait until ``until``."""
+        self.refill(now)
+        self.tokens = min(self.tokens, 1 - (until - now) * self.rate)
+
+
+def parse_retry_after(value: str, now: float) -> float | None:
+    """Returns the ``Retry-After`` delay in seconds, given as seconds or as
+    an HTTP date."""
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Thread safe token bucket rate limiter for :func:`ingest`.
+
+    Pass it as ``rate_limit=`` to ingest; one limiter can be shared by any
+    number of concurrent ingests. Before each request a token is reserved
+    for the host of the request url, and after each response the bucket
+    adapts to the ``Retry-After``, ``X-RateLimit-Remaining`` and
+    ``X-RateLimit-Reset`` headers the server sent.
+
+    :param rate: Requests per second to allow, also the upper bound when the
+        rate adapts to the server headers.
+    :param burst: Number of requests that may be sent at once after idling.
+    :param per_host: Keep one bucket per host instead of one for all hosts.
+    :param clock: Monotonic clock in seconds, for tests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1,
+        per_host: bool = True,
+        clock=time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.per_host = per_host
+        self.clock = clock
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def key(self, url) -> str:
+        return urlsplit(str(url)).netloc if self.per_host else ""
+
+    def bucket(self, url, now: float) -> TokenBucket:
+        key = self.key(url)
+        if key not in self.buckets:
+            self.buckets[key] = TokenBucket(self.rate, self.burst, now)
+        return self.buckets[key]
+
+    @contextmanager
+    def locked_bucket(self, url) -> Iterator[tuple[TokenBucket, float]]:
+        """Holds the lock and yields the bucket of ``url`` with the time."""
+        with self.lock:
+            now = self.clock()
+            yield self.bucket(url, now), now
+
+    def reserve(self, url) -> float:
+        """Reserves a request to ``url`` and returns the seconds to wait."""
+        with self.locked_bucket(url) as (bucket, now):
+            return bucket.reserve(now)
+
+    def acquire(self, url):
+        """Blocks until a request to ``url`` may be sent."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, response):
+        """Adapts the bucket of the response host to its rate limit headers."""
+        headers = response.headers
+        retry_after = headers.get("Retry-After")
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if retry_after is None and remaining is None:
+            return
+        with self.locked_bucket(response.url) as (bucket, now):
+            if retry_after is not None:
+                delay = parse_retry_after(retry_after, time.time())
+                if delay is not None:
+                    bucket.block(now, now + delay)
+            if remaining is None:
+                return
+            remaining = float(remaining)
+            window = None
+            if reset is not None:
+                window = float(reset)
+                if window > EPOCH_THRESHOLD:
+                    window -= time.time()
+            if remaining <= 0:
+                if window is not None and window > 0:
+                    bucket.block(now, now + window)
+                return
+            bucket.refill(now)
+            bucket.tokens = min(bucket.tokens, remaining)
+            if window is not None and window > 0:
+                bucket.rate = min(self.rate, remaining / window)
+            else:
+                bucket.rate = self.rate
+
+
+# Slot of a bucket in the shared file: key hash, rate, tokens, updated.
+SLOT = struct.Struct("<Qddd")
+
+
+def key_hash(key: str) -> int:
+    """Hash of a bucket key that is the same in every process, never 0."""
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") or 1
+
+
+@contextmanager
+def flocked(fd: int) -> Iterator[None]:
+    """Holds an exclusive ``flock`` on the file ``fd``."""
+    if fcntl is None:
+        raise RuntimeError("SharedRateLimiter requires fcntl")
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class SharedRateLimiter(RateLimiter):
+    """:class:`RateLimiter` whose buckets are shared by all processes on the
+    host that open the same file.
+
+    The buckets live in a memory mapped file and every reservation takes an
+    exclusive ``flock`` on it, so the workers together send at ``rate``.
+    The limiter can be pickled into worker processes, which reopen the file.
+    All processes must use the same ``rate``, ``burst`` and ``per_host``.
+
+    :param path: File that holds the buckets, created when missing.
+    :param slots: Number of buckets the file has room for.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        rate: float,
+        burst: float = 1,
+        per_host: bool = True,
+        slots: int = 256,
+        clock=time.monotonic,
+    ):
+        if fcntl is None:
+            raise RuntimeError("SharedRateLimiter requires fcntl")
+        super().__init__(rate, burst, per_host, clock)
+        self.path = path
+        self.slots = slots
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * SLOT.size
+        with flocked(self.fd):
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+
+    def __reduce__(self):
+        return type(self), (
+            self.path,
+            self.rate,
+            self.burst,
+            self.per_host,
+            self.slots,
+            self.clock,
+        )
+
+    def slot(self, key: int) -> int:
+        """Returns the offset of the slot for ``key``, by linear probing."""
+        start = key % self.slots
+        for index in range(self.slots):
+            offset = (start + index) % self.slots * SLOT.size
+            stored = SLOT.unpack_from(self.map, offset)[0]
+            if stored in (key, 0):
+                return offset
+        raise RuntimeError(f"all {self.slots} slots of {self.path} are in use")
+
+    @contextmanager
+    def locked_bucket(self, url) -> Iterator[tuple[TokenBucket, float]]:
+        key = key_hash(self.key(url))
+        with self.lock, flocked(self.fd):
+            now = self.clock()
+            offset = self.slot(key)
+            stored, rate, tokens, updated = SLOT.unpack_from(self.map, offset)
+            bucket = TokenBucket(self.rate, self.burst, now)
+            if stored:
+                bucket.rate, bucket.tokens, bucket.updated = rate, tokens, updated
+            yield bucket, now
+            SLOT.pack_into(
+                self.map, offset, key, bucket.rate, bucket.tokens, bucket.updated
+            )
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
@@ -0,0 +1,212 @@
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+# A path step is either a dict key or EACH, which iterates a list.
+EACH = None
+
+PATH_STEP = re.compile(r"\[\*\]|[^.\[\]]+")
+STRUCTURAL = re.compile(r'["{}\[\]]')
+STRING_SPECIAL = re.compile(r'["\\]')
+SCALAR_END = re.compile(r"[,}\]\s]")
+NON_WHITESPACE = re.compile(r"\S")
+
+
+def parse_path(path: str) -> tuple[str | None, ...]:
+    """Parses a record path such as ``data.items[*]`` into its steps.
+
+    Dotted names select dict keys and ``[*]`` iterates over a list. An empty
+    path or ``[*]`` selects the top level value or its items.
+    """
+    tokens = PATH_STEP.findall(path)
+    if "".join(tokens) != path.replace(".", ""):
+        raise ValueError(f"Invalid record path: {path!r}")
+    return tuple(EACH if token == "[*]" else token for token in tokens)
+
+
+def extract_records(obj: Any, path: str | tuple[str | None, ...]) -> list[Any]:
+    """Selects the records at ``path`` from an already decoded page.
+
+    Missing keys and values of the wrong type select no records.
+    """
+    steps = parse_path(path) if isinstance(path, str) else path
+    selected = [obj]
+    for step in steps:
+        if step is EACH:
+            selected = [
+                item for value in selected if isinstance(value, list) for item in value
+            ]
+        else:
+            selected = [
+                value[step]
+                for value in selected
+                if isinstance(value, dict) and step in value
+            ]
+    return selected
+
+
+class JSONStream:
+    """Incremental reader over a JSON document split in byte chunks.
+
+    Only the part of the document that is being parsed is buffered, values
+    that are skipped are discarded while they are scanned.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, keep_from: int) -> int:
+        """Reads the next chunk, dropping the buffer before ``keep_from``.
+
+        :return: How far the buffer positions shifted to the left.
+        """
+        if self.eof:
+            raise ValueError("Unexpected end of JSON stream")
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.decoder.decode(b"", final=True)
+        else:
+            text = self.decoder.decode(chunk)
+        self.buffer = self.buffer[keep_from:] + text
+        self.pos -= keep_from
+        return keep_from
+
+    def peek(self) -> str:
+        """Skips whitespace and returns the next character, "" at the end."""
+        while True:
+            match = NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return match.group()
+            if self.eof:
+                self.pos = len(self.buffer)
+                return ""
+            self.fill(len(self.buffer))
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, got {char!r}")
+        self.pos += 1
+        return char
+
+    def scan(self, keep: bool) -> str:
+        """Moves past the value at the current position.
+
+        :param keep: Whether to return the text of the value, otherwise
+            objects and arrays are discarded as they are scanned and the
+            returned text may be empty.
+        """
+        char = self.peek()
+        start = self.pos
+        if char not in '{["':
+            while True:
+                match = SCALAR_END.search(self.buffer, start)
+                if match:
+                    end = match.start()
+                    break
+                if self.eof:
+                    end = len(self.buffer)
+                    break
+                start -= self.fill(start)
+            self.pos = end
+            return self.buffer[start:end]
+
+        depth = 0
+        in_string = False
+        index = start
+        while True:
+            if in_string:
+                match = STRING_SPECIAL.search(self.buffer, index)
+                if match and match.group() == "\\":
+                    index = match.end() + 1
+                    if index <= len(self.buffer):
+                        continue
+                elif match:
+                    index = match.end()
+                    in_string = False
+                    if depth == 0:
+                        break
+                    continue
+            else:
+                match = STRUCTURAL.search(self.buffer, index)
+                if match:
+                    index = match.end()
+                    char = match.group()
+                    if char == '"':
+                        in_string = True
+                    elif char in "{[":
+                        depth += 1
+                    else:
+                        depth -= 1
+                        if depth == 0:
+                            break
+                    continue
+            # The value continues beyond the buffered text.
+            keep_from = start if keep else min(index, len(self.buffer))
+            shift = self.fill(keep_from)
+            index -= shift
+            start -= shift
+        self.pos = index
+        return self.buffer[start:index] if keep else ""
+
+    def read(self) -> Any:
+        return json.loads(self.scan(keep=True))
+
+    def select(self, steps: tuple[str | None, ...]) -> Iterator[Any]:
+        """Yields the values at ``steps`` below the current value."""
+        if not steps:
+            yield self.read()
+            return
+        step, rest = steps[0], steps[1:]
+        opening = self.peek()
+        if step is EACH and opening == "[":
+            self.pos += 1
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                yield from self.select(rest)
+                if self.expect(",]") == "]":
+                    return
+        elif step is not EACH and opening == "{":
+            self.pos += 1
+            if self.peek() == "}":
+                self.pos += 1
+                return
+            while True:
+                key = self.read()
+                self.expect(":")
+                if key == step:
+                    yield from self.select(rest)
+                else:
+                    self.scan(keep=False)
+                if self.expect(",}") == "}":
+                    return
+        else:
+            self.scan(keep=False)
+
+
+def iter_records(
+    chunks: Iterable[bytes], path: str | tuple[str | None, ...]
+) -> Iterator[Any]:
+    """Decodes the records at ``path`` while the body is still arriving.
+
+    Peak memory is bounded by the chunk size plus the largest single record,
+    whatever the size of the page.
+
+    :param chunks: The body in byte chunks, e.g. ``response.iter_content()``.
+    :param path: Record path, see :func:`parse_path`.
+    """
+    steps = parse_path(path) if isinstance(path, str) else path
+    stream = JSONStream(chunks)
+    if not stream.peek():
+        return
+    yield from stream.select(steps)
@@ -0,0 +1,255 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from requests import ConnectionError, PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Headers that describe the body on the wire, it is recorded decoded.
+WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def exchange_key(request: PreparedRequest) -> str:
+    """Hashes the method, url and body of a request, not its headers."""
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    elif not isinstance(body, bytes):
+        body = b""
+    digest = hashlib.sha256(f"{request.method} {request.url}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+
+class Archive:
+    """Exchanges recorded by a :class:`RecordingAdapter`.
+
+    A directory with an SQLite index of the requests, statuses, headers and
+    latencies, and one file with the bodies back to back, which
+    :class:`ReplayAdapter` memory maps.
+
+    The archive keeps one connection to the index, close it with
+    :meth:`close` or use the archive as a context manager.
+
+    :param path: Directory of the archive, created when missing.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.bodies_path = self.path / "bodies.bin"
+        self.bodies_path.touch()
+        self.lock = threading.Lock()
+        # Shared by the threads that record, every use holds the lock.
+        self.connection = sqlite3.connect(
+            self.path / "index.db", check_same_thread=False
+        )
+        with self.lock, self.connection as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS exchanges (seq INTEGER PRIMARY KEY,"
+                " key TEXT NOT NULL, method TEXT NOT NULL, url TEXT NOT NULL,"
+                " status INTEGER NOT NULL, reason TEXT, headers TEXT NOT NULL,"
+                " offset INTEGER NOT NULL, length INTEGER NOT NULL,"
+                " elapsed REAL NOT NULL)"
+            )
+
+    def append(self, request: PreparedRequest, response: Response):
+        """Records the exchange, with the body of the response."""
+        body = response.content or b""
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in WIRE_HEADERS
+        }
+        with self.lock:
+            with open(self.bodies_path, "ab") as bodies:
+                offset = bodies.tell()
+                bodies.write(body)
+            with self.connection as connection:
+                connection.execute(
+                    "INSERT INTO exchanges (key, method, url, status, reason,"
+                    " headers, offset, length, elapsed)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        exchange_key(request),
+                        request.method,
+                        request.url,
+                        response.status_code,
+                        response.reason,
+                        json.dumps(headers),
+                        offset,
+                        len(body),
+                        response.elapsed.total_seconds(),
+                    ),
+                )
+
+    def exchanges(self):
+        """Returns the recorded exchanges in the order they were recorded."""
+        with self.lock, self.connection as connection:
+            return connection.execute(
+                "SELECT key, status, reason, headers, offset, length, elapsed"
+                " FROM exchanges ORDER BY seq"
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingAdapter(BaseAdapter):
+    """Transport adapter that sends the requests with ``adapter`` and records
+    every exchange into an :class:`Archive`.
+
+    Mount it on the session passed to :func:`ingest`, or use
+    :func:`record_session`. The bodies are read in full, so streamed
+    responses are recorded as well.
+
+    :param archive: Archive, or the directory of one, to record into.
+    :param adapter: (optional) Adapter that sends the requests, a default
+        :class:`HTTPAdapter` otherwise.
+    """
+
+    def __init__(self, archive: Archive | str | os.PathLike[str], adapter=None):
+        super().__init__()
+        # An archive opened here is closed with the adapter.
+        self.owns_archive = not isinstance(archive, Archive)
+        self.archive = archive if isinstance(archive, Archive) else Archive(archive)
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        response = self.adapter.send(
+            request,
+            stream=stream,
+            timeout=timeout,
+            verify=verify,
+            cert=cert,
+            proxies=proxies,
+        )
+        self.archive.append(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+        if self.owns_archive:
+            self.archive.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers requests from an :class:`Archive`,
+    without touching the network.
+
+    A request is matched on its method, url and body. Exchanges recorded
+    for the same request are served in the order they were recorded, the
+    last one is repeated once they run out. A request that was never
+    recorded raises :class:`ConnectionError`.
+
+    :param archive: Archive, or the directory of one, to replay.
+    :param latency: Wait the recorded latency before every response, instead
+        of answering at memory speed.
+    """
+
+    def __init__(
+        self, archive: Archive | str | os.PathLike[str], latency: bool = False
+    ):
+        super().__init__()
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.exchanges: dict[str, deque[list[Any]]] = {}
+        # An archive opened here is closed once it has been read.
+        with (
+            nullcontext(archive) if isinstance(archive, Archive) else Archive(archive)
+        ) as archive:
+            for key, *exchange in archive.exchanges():
+                self.exchanges.setdefault(key, deque()).append(exchange)
+            with open(archive.bodies_path, "rb") as bodies:
+                size = os.fstat(bodies.fileno()).st_size
+                self.bodies = (
+                    mmap.mmap(bodies.fileno(), size, access=mmap.ACCESS_READ)
+                    if size
+                    else b""
+                )
+
+    def next_exchange(self, request: PreparedRequest):
+        with self.lock:
+            recorded = self.exchanges.get(exchange_key(request))
+            if not recorded:
+                raise ConnectionError(
+                    f"no recorded exchange for {request.method} {request.url}",
+                    request=request,
+                )
+            return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        status, reason, headers, offset, length, elapsed = self.next_exchange(request)
+        if self.latency:
+            time.sleep(elapsed)
+        response = Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = CaseInsensitiveDict(json.loads(headers))
+        # Read through raw like a socket, so streamed responses work too.
+        response.raw = io.BytesIO(self.bodies[offset : offset + length])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url or ""
+        response.request = request
+        setattr(response, "connection", self)
+        response.elapsed = timedelta(seconds=elapsed)
+        return response
+
+    def close(self):
+        if isinstance(self.bodies, mmap.mmap):
+            self.bodies.close()
+
+
+def mount(session: Session, adapter: BaseAdapter) -> Session:
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def record_session(archive: Archive | str | os.PathLike[str], adapter=None) -> Session:
+    """Creates a session that records its exchanges, to pass as ``session=``
+    to :func:`ingest`."""
+    return mount(Session(), RecordingAdapter(archive, adapter))
+
+
+def replay_session(
+    archive: Archive | str | os.PathLike[str], latency: bool = False
+) -> Session:
+    """Creates a session that replays the exchanges of an archive, to pass as
+    ``session=`` to :func:`ingest`."""
+    return mount(Session(), ReplayAdapter(archive, latency))
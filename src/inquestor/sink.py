@@ -0,0 +1,220 @@
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Iterable, Sequence
+from typing import Any, BinaryIO
+
+from .inquestor import ingest
+
+# Marks the end of the chunks handed to the writer thread.
+CLOSED = object()
+
+
+class Sink(ABC):
+    """Writes encoded records to a file, rotating it when it grows too large.
+
+    :param path: Path of the output file. With ``rotate_bytes`` it must
+        contain an ``{index}`` field, e.g. ``out-{index:04d}.ndjson.gz``.
+    :param rotate_bytes: (optional) Start a new file once this many
+        uncompressed bytes have been written to the current one.
+    :param compress: gzip the output, by default when the path ends in
+        ``.gz``.
+    :param compresslevel: gzip compression level.
+    :param buffer_size: Size of the file buffer, so the disk sees few large
+        writes however small the pages are.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        rotate_bytes: int | None = None,
+        compress: bool | None = None,
+        compresslevel: int = 6,
+        buffer_size: int = 1024 * 1024,
+    ):
+        self.path = os.fspath(path)
+        if rotate_bytes and "{index" not in self.path:
+            raise ValueError("rotate_bytes requires an {index} field in the path")
+        self.rotate_bytes = rotate_bytes
+        self.compress = self.path.endswith(".gz") if compress is None else compress
+        self.compresslevel = compresslevel
+        self.buffer_size = buffer_size
+        self.files: list[str] = []
+        self.file: BinaryIO | gzip.GzipFile | None = None
+        self.raw: BinaryIO | None = None
+        self.written = 0
+        self.records = 0
+
+    @abstractmethod
+    def encode(self, records: Sequence[Any]) -> bytes: ...
+
+    def header(self) -> bytes:
+        """Bytes written at the start of every file."""
+        return b""
+
+    def open(self) -> BinaryIO | gzip.GzipFile:
+        path = self.path.format(index=len(self.files))
+        raw = open(path, "wb", buffering=self.buffer_size)
+        file = raw
+        if self.compress:
+            file = gzip.GzipFile(
+                fileobj=raw, mode="wb", compresslevel=self.compresslevel
+            )
+        self.raw, self.file = raw, file
+        self.files.append(path)
+        self.written = 0
+        header = self.header()
+        if header:
+            file.write(header)
+            self.written += len(header)
+        return file
+
+    def write(self, chunk: bytes):
+        file = self.open() if self.file is None else self.file
+        file.write(chunk)
+        self.written += len(chunk)
+        if self.rotate_bytes and self.written >= self.rotate_bytes:
+            self.close()
+
+    def close(self):
+        if self.file is None or self.raw is None:
+            return
+        if self.file is not self.raw:
+            self.file.close()
+        self.raw.close()
+        self.file = self.raw = None
+
+
+class NDJSONSink(Sink):
+    """Writes every record as one line of JSON."""
+
+    def encode(self, records: Sequence[Any]) -> bytes:
+        dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+        return ("\n".join(map(dumps, records)) + "\n").encode()
+
+
+class CSVSink(Sink):
+    """Writes the ``fields`` of every record as a CSV row, each file starts
+    with a header row. Missing fields are left empty, others are ignored."""
+
+    def __init__(self, path: str | os.PathLike[str], fields: Sequence[str], **kwargs):
+        super().__init__(path, **kwargs)
+        self.fields = list(fields)
+
+    def rows(self, rows: Iterable[Any]) -> bytes:
+        text = io.StringIO()
+        writer = csv.DictWriter(text, self.fields, extrasaction="ignore")
+        writer.writerows(rows)
+        return text.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self.rows([dict(zip(self.fields, self.fields, strict=True))])
+
+    def encode(self, records: Sequence[Any]) -> bytes:
+        return self.rows(records)
+
+
+class ByteQueue:
+    """Queue of byte chunks that blocks producers above ``max_bytes``.
+
+    A chunk larger than ``max_bytes`` is still accepted once the queue has
+    drained, so a single large page cannot deadlock the pipeline.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.chunks = deque()
+        self.pending = 0
+        self.failed = False
+        self.condition = threading.Condition()
+
+    def put(self, chunk):
+        size = 0 if chunk is CLOSED else len(chunk)
+        with self.condition:
+            while (
+                self.pending
+                and self.pending + size > self.max_bytes
+                and not self.failed
+            ):
+                self.condition.wait()
+            self.chunks.append(chunk)
+            self.pending += size
+            self.condition.notify_all()
+
+    def get(self):
+        with self.condition:
+            while not self.chunks:
+                self.condition.wait()
+            chunk = self.chunks.popleft()
+            if chunk is not CLOSED:
+                self.pending -= len(chunk)
+            self.condition.notify_all()
+            return chunk
+
+    def fail(self):
+        """Releases the producers after the consumer stopped."""
+        with self.condition:
+            self.failed = True
+            self.condition.notify_all()
+
+
+def ingest_to(
+    sink: Sink,
+    method,
+    url,
+    records: str | None = None,
+    batch_size: int = 1000,
+    max_pending_bytes: int = 16 * 1024 * 1024,
+    **kwargs,
+) -> list[str]:
+    """Runs :func:`ingest` and writes the records to ``sink``.
+
+    Records are encoded in batches of ``batch_size`` and written by a
+    separate thread, so fetching the next pages overlaps with compressing
+    and writing the previous ones. When the writer falls behind by more than
+    ``max_pending_bytes`` of encoded records, fetching waits for it.
+
+    :param sink: :class:`NDJSONSink`, :class:`CSVSink` or another
+        :class:`Sink`, it is closed when the ingest ends.
+    :param records: (optional) Path of the records in a page, see
+        :func:`ingest`. Without it every page is written as one record.
+    :param kwargs: Any other :func:`ingest` argument.
+    :return: The paths of the files written.
+    """
+    chunks = ByteQueue(max_pending_bytes)
+    errors = []
+
+    def write():
+        try:
+            while (chunk := chunks.get()) is not CLOSED:
+                sink.write(chunk)
+        except BaseException as error:
+            errors.append(error)
+            chunks.fail()
+
+    writer = threading.Thread(target=write, name="inquestor-sink", daemon=True)
+    writer.start()
+    try:
+        if records is None:
+            batches = ([page] for page in ingest(method, url, **kwargs))
+        else:
+            batches = ingest(
+                method, url, records=records, batch_size=batch_size, **kwargs
+            )
+        for batch in batches:
+            if errors:
+                break
+            chunks.put(sink.encode(batch))
+            sink.records += len(batch)
+    finally:
+        chunks.put(CLOSED)
+        writer.join()
+        sink.close()
+    if errors:
+        raise errors[0]
+    return sink.files
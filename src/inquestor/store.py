@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def replace_text(path: Path, text: str):
+    """Writes ``text`` to ``path`` through a temporary file in the same
+    directory, so a reader sees either the old or the new content."""
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_text(text)
+    os.replace(temporary, path)
+
+
+class KeyValueTable:
+    """SQLite table of ``(key, <column>, updated)`` rows, one per feed.
+
+    The table keeps one database connection, shared by threads behind a
+    lock, until :meth:`close`.
+
+    :param path: Path of the SQLite database.
+    :param table: Name of the table.
+    :param column: Name of the text column that holds the value.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], table: str, column: str):
+        self.table = table
+        self.column = column
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection as connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}"
+                f" (key TEXT PRIMARY KEY, {column} TEXT NOT NULL,"
+                " updated REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> str | None:
+        with self.lock, self.connection as connection:
+            row = connection.execute(
+                f"SELECT {self.column} FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, value: str):
+        with self.lock, self.connection as connection:
+            connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+
+    def delete(self, key: str):
+        with self.lock, self.connection as connection:
+            connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
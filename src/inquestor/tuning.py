@@ -0,0 +1,137 @@
+import time
+import weakref
+from urllib.parse import parse_qs, urlsplit
+
+from requests import Response
+
+
+class PageSizeTuner:
+    """Adapts the page size of an ingest run to the throughput it observes.
+
+    Pass it as ``page_size=`` to :func:`ingest`. Before every request the
+    ``param`` query parameter is set to the current size. After every
+    response the records per second, the requested size over the time from
+    sending the request until the end of its body, is compared with the
+    best rate so far: the size grows by ``step`` while that improves the
+    rate, and settles on the best size once it stops improving. Retries,
+    server errors and responses slower than ``max_latency`` halve the size
+    and cap it below the size that failed.
+
+    With ``offset`` the tuner also owns the offset parameter, every request
+    starts where the previous one ended whatever its size, so the offsets
+    ``next_page`` returns are overridden and it only decides when to stop.
+
+    :param param: Name of the page size query parameter, e.g. ``limit``.
+    :param minimum: Smallest page size to use.
+    :param maximum: Largest page size to use.
+    :param initial: (optional) Size of the first page, defaults to minimum.
+    :param offset: (optional) Name of the offset query parameter.
+    :param max_latency: (optional) Seconds after which a response counts as
+        too slow.
+    :param step: Factor the size grows by while the rate improves.
+    """
+
+    def __init__(
+        self,
+        param: str,
+        minimum: int,
+        maximum: int,
+        initial: int | None = None,
+        offset: str | None = None,
+        max_latency: float | None = None,
+        step: float = 1.5,
+    ):
+        if not 0 < minimum <= maximum:
+            raise ValueError("page sizes must satisfy 0 < minimum <= maximum")
+        self.param = param
+        self.minimum = minimum
+        self.maximum = maximum
+        self.size = min(max(initial or minimum, minimum), maximum)
+        self.offset_param = offset
+        self.offset = None
+        self.max_latency = max_latency
+        self.step = step
+        self.ceiling = maximum
+        self.best_rate = 0.0
+        self.best_size = self.size
+        self.observed = None
+
+    def requested_size(self, response: Response) -> int | None:
+        query = parse_qs(urlsplit(response.request.url or "").query)
+        values = query.get(self.param)
+        return int(values[0]) if values else None
+
+    def send(self, send, request_input_args):
+        """Sends the request with ``send`` and times it until the end of the
+        body, which is only read later when it is streamed."""
+        start = time.perf_counter()
+        sent = send(request_input_args)
+        response = sent[0]
+        if not request_input_args.get("stream"):
+            setattr(response, "body_seconds", time.perf_counter() - start)
+            return sent
+        # Referenced weakly like the counted stream of a MemoryBudget, whose
+        # iter_content this calls when there is one.
+        ref = weakref.ref(response)
+        iter_content = vars(response).get("iter_content")
+
+        def timed_iter_content(*args, **kwargs):
+            referent = ref()
+            if referent is None:
+                raise RuntimeError("the response was garbage collected")
+            if iter_content is None:
+                yield from Response.iter_content(referent, *args, **kwargs)
+            else:
+                yield from iter_content(*args, **kwargs)
+            setattr(referent, "body_seconds", time.perf_counter() - start)
+
+        setattr(response, "iter_content", timed_iter_content)
+        return sent
+
+    def observe(self, response: Response):
+        """Adjusts the size to the latency and outcome of a response."""
+        size = self.requested_size(response)
+        if size is None:
+            return
+        # Until the end of the body, the headers when it was not timed.
+        seconds = getattr(response, "body_seconds", None)
+        if seconds is None:
+            seconds = response.elapsed.total_seconds()
+        retries = getattr(getattr(response.raw, "retries", None), "history", ())
+        if (
+            retries
+            or getattr(response, "policy_retries", 0)
+            or response.status_code >= 500
+            or (self.max_latency is not None and seconds > self.max_latency)
+        ):
+            self.ceiling = max(min(self.ceiling, size - 1), self.minimum)
+            self.size = max(size // 2, self.minimum)
+            self.best_rate = 0.0
+            self.best_size = self.size
+            return
+        rate = size / max(seconds, 1e-6)
+        if rate > self.best_rate * 1.05:
+            self.best_rate, self.best_size = rate, size
+            self.size = min(max(int(size * self.step), size + 1), self.ceiling)
+        elif rate < self.best_rate * 0.95:
+            self.size = self.best_size
+
+    def params(
+        self, current_params, response: Response | None = None
+    ) -> dict[str, int]:
+        """The page size and offset parameters of the next request.
+
+        :param current_params: The merged params, to take the first offset
+            from.
+        :param response: The latest response, observed once.
+        """
+        if response is not None and response is not self.observed:
+            self.observed = response
+            self.observe(response)
+        params = {self.param: self.size}
+        if self.offset_param:
+            if self.offset is None:
+                self.offset = int((current_params or {}).get(self.offset_param, 0))
+            params[self.offset_param] = self.offset
+            self.offset += self.size
+        return params
@@ -0,0 +1,129 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from .dedup import field_getter
+from .store import KeyValueTable, replace_text
+
+
+class Watermark(ABC):
+    """High-watermark of an incremental feed, persisted between runs.
+
+    Pass it as ``watermark=`` to :func:`ingest`. The stored watermark is
+    merged into the first request, so only records that are new or changed
+    since the last run are fetched. During the run the watermark is taken
+    from every record, or every page without ``records``, and it is only
+    stored once the run completed, so a failed run is simply repeated.
+
+    :param value: Field of the record to take the watermark from, dotted for
+        nested fields, or a function of the record or page.
+    :param inject: Name of the query parameter to send the watermark in, or
+        a function that returns the ``next_page`` style dict to merge, such
+        as ``{"params": {"updated_since": value}}``.
+    :param keep: ``max`` keeps the largest value seen, such as an
+        ``updated_at``; ``last`` keeps the latest, such as a cursor.
+    :param initial: (optional) Watermark of the first run.
+    """
+
+    def __init__(
+        self,
+        value: str | Callable[[Any], Any],
+        inject: str | Callable[[Any], dict[str, Any]],
+        keep: str = "max",
+        initial: Any = None,
+    ):
+        if keep not in ("max", "last"):
+            raise ValueError("keep must be 'max' or 'last'")
+        self.value = field_getter(value) if isinstance(value, str) else value
+        self.inject = inject
+        self.keep = keep
+        self.initial = initial
+        self.candidate = None
+
+    @abstractmethod
+    def load(self) -> Any: ...
+
+    @abstractmethod
+    def save(self, value: Any): ...
+
+    def close(self):
+        """Releases what the store holds open, nothing by default."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self) -> dict[str, Any] | None:
+        """Returns the arguments to merge into the first request."""
+        self.candidate = None
+        value = self.load()
+        if value is None:
+            value = self.initial
+        if value is None:
+            return None
+        if callable(self.inject):
+            return self.inject(value)
+        return {"params": {self.inject: value}}
+
+    def observe(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Passes the items through, following their watermark."""
+        for item in items:
+            value = self.value(item)
+            if value is not None and (
+                self.keep == "last" or self.candidate is None or value > self.candidate
+            ):
+                self.candidate = value
+            yield item
+
+    def commit(self):
+        """Stores the watermark of a completed run."""
+        if self.candidate is not None:
+            self.save(self.candidate)
+
+
+class FileWatermark(Watermark):
+    """Keeps the watermark in a JSON file, replaced atomically on save."""
+
+    def __init__(self, path: str | os.PathLike[str], value, inject, **kwargs):
+        super().__init__(value, inject, **kwargs)
+        self.path = Path(path)
+
+    def load(self) -> Any:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return None
+
+    def save(self, value: Any):
+        replace_text(self.path, json.dumps(value))
+
+
+class SQLiteWatermark(Watermark):
+    """Keeps the watermarks of many feeds in one SQLite database.
+
+    The database connection stays open until :meth:`close`, or use the
+    watermark as a context manager.
+
+    :param key: Name of the feed in the database.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], key: str, value, inject, **kwargs):
+        super().__init__(value, inject, **kwargs)
+        self.path = path
+        self.key = key
+        self.table = KeyValueTable(path, "watermarks", "value")
+
+    def load(self) -> Any:
+        text = self.table.get(self.key)
+        return json.loads(text) if text is not None else None
+
+    def save(self, value: Any):
+        self.table.put(self.key, json.dumps(value))
+
+    def close(self):
+        self.table.close()
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from multiprocessing import get_context
+from queue import Full, Queue
+
+
+class Marker(Enum):
+    """Put on a :class:`Handoff` by a producer after its items. Enum members
+    stay identical when they are pickled between processes."""
+
+    done = "done"
+    failed = "failed"
+
+
+DONE = Marker.done
+FAILED = Marker.failed
+
+
+class Handoff:
+    """Bounded queue from producer threads or processes to one consumer.
+
+    :meth:`put` blocks while the queue is full, until the consumer calls
+    :meth:`close`, so producers never block on a consumer that is gone.
+
+    :param maxsize: Maximum number of items waiting to be consumed.
+    :param manager: (optional) ``multiprocessing`` manager that holds the
+        queue and stop event, so the handoff can be passed to worker
+        processes.
+    """
+
+    def __init__(self, maxsize: int, manager=None):
+        if manager is None:
+            self.queue = Queue(maxsize=maxsize)
+            self.stop = threading.Event()
+        else:
+            self.queue = manager.Queue(maxsize)
+            self.stop = manager.Event()
+
+    def put(self, item) -> bool:
+        """Queues ``item``, returns False when the consumer closed first."""
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def get(self, timeout: float | None = None):
+        """Takes the next item, raises :class:`queue.Empty` after ``timeout``
+        seconds without one."""
+        return self.queue.get(timeout=timeout)
+
+    def close(self):
+        self.stop.set()
+
+
+def spawn_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Creates a process pool whose workers may run :func:`ingest`.
+
+    The workers are spawned, forking a process that runs ingest threads can
+    deadlock the child.
+    """
+    return ProcessPoolExecutor(max_workers, mp_context=get_context("spawn"))
@@ -0,0 +1,128 @@
+import json
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import responses
+from pytest import fixture
+from responses import matchers
+
+
+def page_counter(pages=None):
+    """Returns a ``next_page`` hook that requests ``page=0, 1, ...``, up to
+    ``pages`` pages or without end."""
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"params": {"page": 0}}
+        page = keyword_arg_dict["params"]["page"] + 1
+        return {"params": {"page": page}} if pages is None or page < pages else False
+
+    return next_page
+
+
+def add_pages(
+    pages,
+    body=lambda page: {"page": page},
+    url="https://api.test",
+    params=None,
+    failing=None,
+    status=200,
+    headers=None,
+):
+    """Registers a ``responses`` JSON page for every page number, matched on
+    its ``page`` and the other ``params``. The ``failing`` page is a 500."""
+    for page in pages:
+        responses.add(
+            responses.GET,
+            url,
+            json=body(page),
+            status=500 if page == failing else status,
+            headers=headers,
+            match=[matchers.query_param_matcher({"page": page} | (params or {}))],
+        )
+
+
+class StubServer:
+    """Local HTTP server answering registered JSON responses.
+
+    Responses are matched on path and query parameters; registering several
+    responses for the same request serves them in order and keeps repeating
+    the last one.
+    """
+
+    def __init__(self):
+        self.routes = defaultdict(list)
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add(self, path, json=None, status=200, headers=None, params=None, body=None):
+        key = (path, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        self.routes[key].append((status, json, headers or {}, body))
+
+    def handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = tuple(sorted(parse_qsl(parts.query)))
+                with stub.lock:
+                    stub.connections.add(self.client_address)
+                    stub.requests.append((parts.path, dict(params), dict(self.headers)))
+                    responses = stub.routes.get((parts.path, params))
+                    if not responses:
+                        status, payload, headers, body = (
+                            404,
+                            {"error": "no route"},
+                            {},
+                            None,
+                        )
+                    elif len(responses) > 1:
+                        status, payload, headers, body = responses.pop(0)
+                    else:
+                        status, payload, headers, body = responses[0]
+                if body is None:
+                    body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@fixture
+def stub_server():
+    with StubServer() as server:
+        yield server
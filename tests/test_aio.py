@@ -0,0 +1,207 @@
+import asyncio
+import time
+
+from pytest import raises
+from urllib3.util import Retry
+
+from src.inquestor.aio import aingest
+from src.inquestor.auth import TokenProvider
+
+
+async def collect(pages):
+    return [page async for page in pages]
+
+
+def test_aingest(stub_server):
+    for page in range(3):
+        stub_server.add(
+            "/items",
+            json={"data": f"response{page}"},
+            params={"page": page, "size": 10},
+        )
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"params": {"page": 0}}
+        arg_value = keyword_arg_dict["params"]
+        arg_value["page"] += 1
+        if arg_value["page"] > 2:
+            return False
+        return {"params": arg_value}
+
+    data = asyncio.run(
+        collect(
+            aingest(
+                method="GET",
+                url=f"{stub_server.url}/items",
+                params={"size": 10},
+                next_page=next_page,
+            )
+        )
+    )
+    assert [item["data"] for item in data] == ["response0", "response1", "response2"]
+
+
+def test_aingest_async_hooks(stub_server):
+    stub_server.add("/a", json={"data": "response1", "next_url": "/b"})
+    stub_server.add("/b", json={"data": "response2"})
+    calls = []
+
+    async def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": f"{stub_server.url}/a"}
+        next_url = response.json().get("next_url")
+        return {"url": f"{stub_server.url}{next_url}"} if next_url else False
+
+    async def authenticate(reauth_dict=None, response=None):
+        return {"headers": {"authorization": "Bearer token"}}, reauth_dict
+
+    async def rate_limit(ratelimit_dict=None, response=None):
+        calls.append(response)
+        await asyncio.sleep(0)
+        return ratelimit_dict
+
+    data = asyncio.run(
+        collect(
+            aingest(
+                method="GET",
+                url=stub_server.url,
+                next_page=next_page,
+                authenticate=authenticate,
+                rate_limit=rate_limit,
+            )
+        )
+    )
+    assert [item["data"] for item in data] == ["response1", "response2"]
+    assert calls[0] is None and len(calls) == 2
+    assert all(
+        headers["authorization"] == "Bearer token"
+        for _path, _params, headers in stub_server.requests
+    )
+
+
+def test_aingest_retry(stub_server):
+    stub_server.add("/", json={"error": "errorresponse"}, status=503)
+    stub_server.add("/", json={"data": "response_success"})
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": stub_server.url + "/"}
+        return False
+
+    data = asyncio.run(
+        collect(
+            aingest(
+                method="GET",
+                url=stub_server.url,
+                next_page=next_page,
+                retries=Retry(total=3, backoff_factor=0, status_forcelist=[503]),
+            )
+        )
+    )
+    assert data == [{"data": "response_success"}]
+
+
+def test_aingest_retry_status_exhausted(stub_server):
+    stub_server.add("/", json={"error": "errorresponse"}, status=503)
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": stub_server.url + "/"}
+        return False
+
+    async def run():
+        return await asyncio.wait_for(
+            collect(
+                aingest(
+                    method="GET",
+                    url=stub_server.url,
+                    next_page=next_page,
+                    retries=Retry(
+                        total=None, status=2, backoff_factor=0, status_forcelist=[503]
+                    ),
+                )
+            ),
+            timeout=5,
+        )
+
+    assert asyncio.run(run()) == []
+    assert len(stub_server.requests) == 3
+
+
+def test_aingest_shared_loop(stub_server):
+    import httpx
+
+    feeds = 50
+    for feed in range(feeds):
+        stub_server.add(f"/feed/{feed}", json={"data": feed})
+
+    def make_next_page(feed):
+        def next_page(keyword_arg_dict=None, response=None):
+            if keyword_arg_dict is None:
+                return {"url": f"{stub_server.url}/feed/{feed}"}
+            return False
+
+        return next_page
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await asyncio.gather(
+                *(
+                    collect(
+                        aingest(
+                            method="GET",
+                            url=stub_server.url,
+                            next_page=make_next_page(feed),
+                            client=client,
+                        )
+                    )
+                    for feed in range(feeds)
+                )
+            )
+
+    results = asyncio.run(run())
+    assert [pages[0]["data"] for pages in results] == list(range(feeds))
+
+
+def test_aingest_next_page_function_correct():
+    with raises(TypeError):
+        asyncio.run(
+            collect(aingest(method="GET", url="http://api.test", next_page="nope"))
+        )
+
+
+def test_aingest_token_provider_does_not_block_the_loop(stub_server):
+    stub_server.add("/", json={"data": "response"})
+    ticks = []
+
+    def fetch_token():
+        time.sleep(0.3)
+        return "token", 60.0
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": stub_server.url + "/"}
+        return False
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        ticker = asyncio.create_task(tick())
+        data = await collect(
+            aingest(
+                method="GET",
+                url=stub_server.url,
+                next_page=next_page,
+                authenticate=TokenProvider(fetch_token),
+            )
+        )
+        ticker.cancel()
+        return data
+
+    assert asyncio.run(run()) == [{"data": "response"}]
+    assert len(ticks) > 10
+    assert stub_server.requests[0][2]["Authorization"] == "Bearer token"
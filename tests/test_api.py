@@ -2,11 +2,20 @@ import responses
 import requests
 from datetime import datetime, timedelta
 from pytest import mark, raises
-from src.inquestor.inquestor import ingest, update_args, update_arg, validate_keys
+from src.inquestor.inquestor import (
+    PoolConfig,
+    RequestPlan,
+    ingest,
+    make_session,
+    update_args,
+    update_arg,
+    validate_keys,
+)
 from dataclasses import dataclass
 from requests import Response
 from responses import matchers
 from urllib3.util import Url, Retry
+import json
 import time
 
 
@@ -58,6 +67,27 @@ def test_validate_keys():
         )
 
 
+def test_request_plan_merge():
+    def next_page(keyword_arg_dict=None, response=None):
+        return False
+
+    local_args = {"params": {"param1": 0, "param2": 0}, "url": "https://api.test"}
+    plan = RequestPlan(dict(local_args), next_page)
+    params = plan.args["params"]
+    for args_dict in [
+        {"url": "https://api.test_new"},
+        {"params": {"param1": 10}},
+        {"headers": {"authorization": "Bearer token"}},
+    ]:
+        local_args = update_args(args_dict, local_args)
+        assert plan.merge(args_dict) == local_args
+    assert plan.args["params"] is params
+    with raises(ValueError):
+        plan.merge({"not_a_key": "value"})
+    with raises(TypeError):
+        RequestPlan(local_args, next_page, authenticate="not a function")
+
+
 exchange_data_params = [
     ExchangeData(
         ResponsesData(json={"data": "response1"}, status_code=200),
@@ -475,3 +505,98 @@ def test_rate_limit(mocker):
         assert item["data"] == response_list[i]
 
     mock_sleep.assert_called_once_with(1)
+
+
+@responses.activate
+def test_prefetch():
+    delays = [0.2, 0.1, 0.0]
+    for i, item in enumerate(exchange_data_params):
+
+        def callback(request, i=i, item=item):
+            time.sleep(delays[i])
+            return 200, {}, json.dumps(item.response_data.json)
+
+        responses.add_callback(
+            responses.GET,
+            str(item.request_data.url),
+            callback=callback,
+            match=[matchers.query_param_matcher(item.request_data.params)],
+        )
+    data = ingest(
+        method="GET",
+        url="https://api.test",
+        next_page=next_page_params,
+        params={"param2": 0},
+        prefetch=3,
+    )
+    assert [item["data"] for item in data] == ["response1", "response2", "response3"]
+
+
+@responses.activate
+def test_prefetch_stops_at_empty_page():
+    for page in range(4):
+        responses.add(
+            responses.GET,
+            "https://api.test",
+            json=[page] if page < 2 else [],
+            match=[matchers.query_param_matcher({"page": page})],
+        )
+
+    def next_page(keyword_arg_dict=None, response: Response | None = None):
+        if keyword_arg_dict is None:
+            return {"params": {"page": 0}}
+        return {"params": {"page": keyword_arg_dict["params"]["page"] + 1}}
+
+    data = ingest(method="GET", url="https://api.test", next_page=next_page, prefetch=2)
+    assert list(data) == [[0], [1]]
+
+
+@responses.activate
+def test_retry_https():
+    responses.add(responses.GET, "https://api.test", json={"error": "e"}, status=500)
+    responses.add(responses.GET, "https://api.test", json={"data": "response_success"})
+
+    def next_page(keyword_arg_dict=None, response: Response | None = None):
+        if keyword_arg_dict is None:
+            return {"url": "https://api.test"}
+        return False
+
+    data = ingest(
+        method="GET",
+        url="https://api.test",
+        next_page=next_page,
+        retries=Retry(total=3, backoff_factor=0, status_forcelist=[500]),
+    )
+    assert list(data) == [{"data": "response_success"}]
+
+
+def test_make_session_mounts_both_schemes():
+    retries = Retry(total=3)
+    session = make_session(
+        retries=retries, pool=PoolConfig(pool_maxsize=32, keep_alive=False)
+    )
+    http, https = session.get_adapter("http://a"), session.get_adapter("https://a")
+    assert http is https
+    assert https.max_retries is retries
+    assert https._pool_maxsize == 32
+    assert session.headers["Connection"] == "close"
+
+
+def test_shared_session_reuses_connections(stub_server):
+    stub_server.add("/", json={"data": "response1"})
+
+    def next_page(keyword_arg_dict=None, response: Response | None = None):
+        if keyword_arg_dict is None:
+            return {"url": stub_server.url + "/"}
+        return False
+
+    session = make_session()
+    for _run in range(3):
+        assert list(
+            ingest("GET", stub_server.url, next_page=next_page, session=session)
+        )
+    session.close()
+    assert len(stub_server.requests) == 3
+    assert len(stub_server.connections) == 1
+    with raises(ValueError):
+        list(ingest("GET", stub_server.url, session=session, retries=Retry(total=1)))
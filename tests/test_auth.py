@@ -0,0 +1,124 @@
+import threading
+import time
+
+import responses
+from requests import Response
+from responses import matchers
+
+from src.inquestor.auth import TokenProvider
+from src.inquestor.inquestor import ingest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_fetch(expires_in=60.0, delay=0.0):
+    calls = []
+
+    def fetch_token():
+        calls.append(None)
+        time.sleep(delay)
+        return f"token{len(calls)}", expires_in
+
+    return fetch_token, calls
+
+
+def test_token_cached_until_refresh_margin():
+    clock = FakeClock()
+    fetch_token, calls = counting_fetch()
+    provider = TokenProvider(
+        fetch_token, refresh_margin=10, background=False, clock=clock
+    )
+    assert provider.token() == "token1"
+    clock.now = 49
+    assert provider.token() == "token1"
+    clock.now = 51
+    assert provider.token() == "token2"
+    assert len(calls) == 2
+
+
+def test_background_refresh_keeps_serving_token():
+    clock = FakeClock()
+    fetch_token, calls = counting_fetch()
+    provider = TokenProvider(fetch_token, refresh_margin=10, clock=clock)
+    assert provider.token() == "token1"
+    clock.now = 55
+    assert provider.token() == "token1"
+    deadline = time.monotonic() + 2
+    while provider.refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert provider.token() == "token2"
+    assert len(calls) == 2
+
+
+def test_single_flight():
+    fetch_token, calls = counting_fetch(delay=0.1)
+    provider = TokenProvider(fetch_token)
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(provider.token()))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert tokens == ["token1"] * 10
+    assert len(calls) == 1
+
+
+def test_hook_only_merges_changed_token():
+    fetch_token, _calls = counting_fetch()
+    provider = TokenProvider(fetch_token)
+    authenticate_args, reauth_dict = provider()
+    assert authenticate_args == {"headers": {"Authorization": "Bearer token1"}}
+    assert provider(reauth_dict=reauth_dict) == (None, reauth_dict)
+    provider.invalidate("Bearer stale")
+    assert provider(reauth_dict=reauth_dict) == (None, reauth_dict)
+    provider.invalidate("Bearer token1")
+    authenticate_args, _reauth_dict = provider(reauth_dict=reauth_dict)
+    assert authenticate_args == {"headers": {"Authorization": "Bearer token2"}}
+
+
+@responses.activate
+def test_ingest_refreshes_token_on_401():
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        status=401,
+        match=[matchers.header_matcher({"Authorization": "Bearer token1"})],
+    )
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        json={"data": "response1"},
+        match=[matchers.header_matcher({"Authorization": "Bearer token2"})],
+    )
+    responses.add(
+        responses.GET,
+        "https://api.test2",
+        json={"data": "response2"},
+        match=[matchers.header_matcher({"Authorization": "Bearer token2"})],
+    )
+    fetch_token, calls = counting_fetch()
+
+    def next_page(keyword_arg_dict=None, response: Response | None = None):
+        if keyword_arg_dict is None:
+            return {"url": "https://api.test"}
+        if keyword_arg_dict["url"] == "https://api.test":
+            return {"url": "https://api.test2"}
+        return False
+
+    data = ingest(
+        method="GET",
+        url="https://api.test",
+        next_page=next_page,
+        authenticate=TokenProvider(fetch_token),
+    )
+    assert [item["data"] for item in data] == ["response1", "response2"]
+    assert len(calls) == 2
@@ -0,0 +1,114 @@
+import io
+import threading
+import time
+
+import responses
+from pytest import mark
+from requests import Response
+
+from src.inquestor.budget import MemoryBudget, release_response
+from src.inquestor.inquestor import ingest
+from tests.conftest import add_pages, page_counter
+
+next_page = page_counter(3)
+
+
+def padded(page):
+    return {"page": page, "padding": "x" * 100}
+
+
+@mark.parametrize("prefetch", [0, 2])
+@responses.activate
+def test_pages_larger_than_the_budget_still_flow(prefetch):
+    add_pages(range(3), padded)
+    budget = MemoryBudget(10)
+    data = ingest(
+        "GET", "https://api.test", next_page=next_page, prefetch=prefetch, budget=budget
+    )
+    assert [page["page"] for page in data] == [0, 1, 2]
+    assert budget.peak > 100
+    assert budget.in_flight == 0
+
+
+@responses.activate
+def test_fetches_wait_for_pages_held_by_other_ingests():
+    add_pages(range(3), padded, url="https://a.test")
+    add_pages(range(3), padded, url="https://b.test")
+    budget = MemoryBudget(10)
+    first = ingest("GET", "https://a.test", next_page=next_page, budget=budget)
+    assert next(first)["page"] == 0
+    assert budget.in_flight > 10
+
+    second = ingest("GET", "https://b.test", next_page=next_page, budget=budget)
+    received = []
+    thread = threading.Thread(target=lambda: received.extend(second))
+    thread.start()
+    thread.join(0.2)
+    assert received == []
+    assert len(responses.calls) == 1
+
+    first.close()
+    thread.join(5)
+    assert [page["page"] for page in received] == [0, 1, 2]
+    assert budget.in_flight == 0
+
+
+@mark.parametrize(
+    "prefetch,lookahead,decode_processes", [(0, 3, 0), (2, 3, 0), (0, 0, 1), (0, 2, 1)]
+)
+@responses.activate
+def test_queued_pages_stay_in_flight_until_consumed(
+    prefetch, lookahead, decode_processes
+):
+    add_pages(range(3), padded)
+    budget = MemoryBudget(10)
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        prefetch=prefetch,
+        lookahead=lookahead,
+        decode_processes=decode_processes,
+        budget=budget,
+    )
+    assert next(data)["page"] == 0
+    time.sleep(0.2)
+    assert len(responses.calls) == 1
+    assert budget.in_flight > 100
+    assert [page["page"] for page in data] == [1, 2]
+    assert budget.in_flight == 0
+
+
+def test_streamed_bodies_count_the_bytes_read():
+    response = Response()
+    response.raw = io.BytesIO(b"x" * 300)
+    budget = MemoryBudget(1000)
+    budget.charge(response, stream=True)
+    assert budget.in_flight == 0
+    assert sum(len(chunk) for chunk in response.iter_content(100)) == 300
+    assert budget.in_flight == 300
+    release_response(response)
+    release_response(response)
+    assert budget.in_flight == 0
+
+
+def test_streamed_bodies_are_read_after_the_response_is_dropped():
+    response = Response()
+    response.raw = io.BytesIO(b"x" * 300)
+    budget = MemoryBudget(1000)
+    budget.charge(response, stream=True)
+    chunks = response.iter_content(100)
+    release_response(response)
+    del response
+    assert sum(len(chunk) for chunk in chunks) == 300
+    assert budget.in_flight == 0
+
+
+def test_content_length_is_charged_up_front():
+    response = Response()
+    response.headers["Content-Length"] = "512"
+    budget = MemoryBudget(1000)
+    budget.charge(response, stream=True)
+    assert budget.in_flight == 512
+    del response
+    assert budget.in_flight == 0
@@ -0,0 +1,69 @@
+import requests
+
+from src.inquestor.cache import ResponseCache, cache_key
+from src.inquestor.inquestor import ingest
+from tests.conftest import page_counter
+
+next_page = page_counter(2)
+
+
+def authenticate(reauth_dict=None, response=None):
+    count = (reauth_dict or {}).get("count", 0) + 1
+    return {"headers": {"Authorization": f"Bearer {count}"}}, {"count": count}
+
+
+def test_not_modified_pages_are_served_from_cache(stub_server, tmp_path):
+    etags = {0: '"a"', 1: '"b"'}
+    for page, etag in etags.items():
+        stub_server.add(
+            "/items", {"page": page}, headers={"ETag": etag}, params={"page": page}
+        )
+        stub_server.add("/items", status=304, params={"page": page}, body=b"")
+    with ResponseCache(tmp_path / "cache.db") as cache:
+        for _run in range(2):
+            data = ingest(
+                "GET",
+                f"{stub_server.url}/items",
+                next_page=next_page,
+                authenticate=authenticate,
+                cache=cache,
+            )
+            assert list(data) == [{"page": 0}, {"page": 1}]
+    sent = [headers for _path, _params, headers in stub_server.requests]
+    assert [headers.get("If-None-Match") for headers in sent] == [
+        None,
+        None,
+        '"a"',
+        '"b"',
+    ]
+
+
+def test_cache_key_ignores_credentials():
+    args = {"method": "GET", "url": "https://api.test", "params": {"page": 1}}
+    assert cache_key(
+        args | {"headers": {"Authorization": "Bearer 1", "Accept": "json"}}
+    ) == cache_key(args | {"headers": {"authorization": "Bearer 2", "Accept": "json"}})
+    assert cache_key(args) != cache_key(args | {"params": {"page": 2}})
+
+
+def test_least_recently_used_responses_are_evicted(stub_server, tmp_path):
+    for page in range(3):
+        stub_server.add(
+            "/items",
+            body=b"x" * 100,
+            headers={"ETag": f'"{page}"'},
+            params={"page": page},
+        )
+    cache = ResponseCache(tmp_path / "cache.db", max_bytes=250)
+    with cache, requests.Session() as session:
+        keys = []
+        for page in range(3):
+            args = {"method": "GET", "url": f"{stub_server.url}/items"}
+            args["params"] = {"page": page}
+            cache.request(session, **args)
+            keys.append(cache_key(args))
+            if page == 1:
+                cache.load(keys[0])
+        assert cache.validators(keys[0]) == ('"0"', None)
+        assert cache.validators(keys[1]) is None
+        assert cache.validators(keys[2]) == ('"2"', None)
@@ -0,0 +1,88 @@
+import responses
+from pytest import mark, raises
+from urllib3.util import Url
+
+from src.inquestor.checkpoint import (
+    CheckpointState,
+    FileCheckpoint,
+    SQLiteCheckpoint,
+)
+from src.inquestor.inquestor import ingest
+from tests.conftest import add_pages, page_counter
+
+next_page = page_counter(5)
+
+
+@mark.parametrize("prefetch", [0, 2])
+@responses.activate
+def test_resume_after_failed_page(tmp_path, prefetch):
+    checkpoint = FileCheckpoint(tmp_path / "feed.json", every=1)
+    add_pages(range(4), params={"size": 10}, failing=3)
+    data = ingest(
+        "GET",
+        "https://api.test",
+        params={"size": 10},
+        next_page=next_page,
+        checkpoint=checkpoint,
+        prefetch=prefetch,
+    )
+    assert [item["page"] for item in data] == [0, 1, 2]
+    state = checkpoint.load()
+    assert state.pages == 3
+    assert state.next_page == {"params": {"page": 3}}
+
+    responses.reset()
+    add_pages(range(3, 5), params={"size": 10})
+    data = ingest(
+        "GET",
+        "https://api.test",
+        params={"size": 10},
+        next_page=next_page,
+        checkpoint=checkpoint,
+        resume=True,
+        prefetch=prefetch,
+    )
+    assert [item["page"] for item in data] == [3, 4]
+    assert checkpoint.load() is None
+
+
+@responses.activate
+def test_resume_after_consumer_error(tmp_path):
+    path = tmp_path / "checkpoints.db"
+    with SQLiteCheckpoint(path, key="feed", every=100) as checkpoint:
+        add_pages(range(5), params={"size": 10})
+        consumed = []
+        with raises(RuntimeError):
+            for item in ingest(
+                "GET",
+                "https://api.test",
+                params={"size": 10},
+                next_page=next_page,
+                checkpoint=checkpoint,
+            ):
+                if item["page"] == 2:
+                    raise RuntimeError("consumer crashed")
+                consumed.append(item["page"])
+        assert checkpoint.load().pages == 2
+
+        data = ingest(
+            "GET",
+            "https://api.test",
+            params={"size": 10},
+            next_page=next_page,
+            checkpoint=checkpoint,
+            resume=True,
+        )
+        assert consumed + [item["page"] for item in data] == [0, 1, 2, 3, 4]
+        assert checkpoint.load() is None
+
+
+def test_checkpoint_round_trips_url_objects(tmp_path):
+    checkpoint = FileCheckpoint(tmp_path / "feed.json")
+    url = Url(scheme="https", host="api.test", path="/2")
+    checkpoint.save(CheckpointState(next_page={"url": url}, pages=2))
+    assert checkpoint.load() == CheckpointState(next_page={"url": url}, pages=2)
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    with raises(ValueError):
+        list(ingest("GET", "https://api.test", resume=True))
@@ -0,0 +1,65 @@
+import math
+from array import array
+
+import responses
+from pytest import importorskip, raises
+
+from src.inquestor.columns import Projection
+from src.inquestor.inquestor import ingest
+
+RECORDS = [
+    {"id": 1, "price": {"amount": 9.5}, "name": "a", "tags": ["x"]},
+    {"id": 2, "price": {}, "name": "b", "tags": []},
+    {"id": 3, "price": {"amount": 1.0}, "name": "c", "tags": ["y"]},
+]
+
+
+def single_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"page": 0}}
+    return False
+
+
+def test_projection_builds_typed_columns():
+    project = Projection(
+        {"id": "id", "price": "price.amount", "name": "name"},
+        types={"id": int, "price": float},
+    )
+    columns = project(RECORDS)
+    assert columns["id"] == array("q", [1, 2, 3])
+    assert columns["price"][0] == 9.5
+    assert math.isnan(columns["price"][1])
+    assert columns["name"] == ["a", "b", "c"]
+
+
+def test_missing_values_in_int_columns_raise():
+    project = Projection(["price.amount"], types={"price.amount": "q"})
+    with raises(ValueError, match="price.amount"):
+        project(RECORDS)
+    with raises(ValueError):
+        Projection(["id"], types={"name": str})
+
+
+@responses.activate
+def test_ingest_yields_column_batches():
+    responses.add(responses.GET, "https://api.test", json={"data": RECORDS})
+    batches = list(
+        ingest(
+            "GET",
+            "https://api.test",
+            next_page=single_page,
+            records="data[*]",
+            batch_size=2,
+            columns=Projection(["id"], types={"id": int}),
+        )
+    )
+    assert batches == [{"id": array("q", [1, 2])}, {"id": array("q", [3])}]
+    with raises(ValueError):
+        next(ingest("GET", "https://api.test", columns=Projection(["id"])))
+
+
+def test_numpy_columns():
+    numpy = importorskip("numpy")
+    columns = Projection(["id"], types={"id": int}, as_numpy=True)(RECORDS)
+    assert isinstance(columns["id"], numpy.ndarray)
+    assert columns["id"].tolist() == [1, 2, 3]
@@ -0,0 +1,79 @@
+import json
+
+import responses
+from pytest import mark, raises
+from responses import matchers
+
+from src.inquestor.decoders import ACCEPT_ENCODING, fastest_loads
+from src.inquestor.inquestor import ingest
+
+
+def single_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"page": 0}}
+    return False
+
+
+def add_page(headers=None):
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        body=b'{"items": [1, 2]}',
+        match=[matchers.header_matcher(headers or {})],
+    )
+
+
+@mark.parametrize("decoder", [bytes, memoryview])
+@responses.activate
+def test_raw_bodies(decoder):
+    add_page()
+    pages = list(
+        ingest("GET", "https://api.test", next_page=single_page, decoder=decoder)
+    )
+    assert isinstance(pages[0], decoder)
+    assert bytes(pages[0]) == b'{"items": [1, 2]}'
+
+
+@responses.activate
+def test_custom_decoder_with_records():
+    add_page()
+    calls = []
+
+    def loads(body):
+        calls.append(body)
+        return json.loads(body)
+
+    records = ingest(
+        "GET",
+        "https://api.test",
+        next_page=single_page,
+        records="items[*]",
+        decoder=loads,
+    )
+    assert list(records) == [1, 2]
+    assert calls == [b'{"items": [1, 2]}']
+
+
+def test_raw_bodies_have_no_records():
+    with raises(ValueError):
+        next(ingest("GET", "https://api.test", records="items[*]", decoder=bytes))
+
+
+@mark.parametrize(
+    ("accept_encoding", "header"),
+    [(True, ACCEPT_ENCODING), (False, "identity"), ("gzip", "gzip")],
+)
+@responses.activate
+def test_accept_encoding(accept_encoding, header):
+    add_page({"Accept-Encoding": header})
+    pages = ingest(
+        "GET",
+        "https://api.test",
+        next_page=single_page,
+        accept_encoding=accept_encoding,
+    )
+    assert list(pages) == [{"items": [1, 2]}]
+
+
+def test_fastest_loads_decodes_bytes():
+    assert fastest_loads()(b'{"a": 1}') == {"a": 1}
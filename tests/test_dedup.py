@@ -0,0 +1,58 @@
+import responses
+from pytest import raises
+from responses import matchers
+
+from src.inquestor.dedup import BloomFilter, Deduplicator
+from src.inquestor.inquestor import ingest
+
+
+def next_offset(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"offset": 0}}
+    offset = keyword_arg_dict["params"]["offset"] + 3
+    return {"params": {"offset": offset}} if offset < 9 else False
+
+
+@responses.activate
+def test_shifted_offset_pages_are_deduplicated():
+    # Two records were inserted in front while paging, so records shift back.
+    pages = {0: [1, 2, 3], 3: [3, 4, 5], 6: [4, 5, 6]}
+    for offset, ids in pages.items():
+        responses.add(
+            responses.GET,
+            "https://api.test",
+            json={"data": [{"meta": {"id": i}} for i in ids]},
+            match=[matchers.query_param_matcher({"offset": offset})],
+        )
+    dedup = Deduplicator("meta.id", capacity=100)
+    records = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_offset,
+        records="data[*]",
+        dedup=dedup,
+    )
+    assert [record["meta"]["id"] for record in records] == [1, 2, 3, 4, 5, 6]
+    assert dedup.duplicates == 3
+
+
+def test_dedup_requires_records():
+    with raises(ValueError):
+        next(ingest("GET", "https://api.test", dedup=Deduplicator("id")))
+
+
+def test_old_keys_are_remembered_by_the_filter():
+    dedup = Deduplicator(lambda record: record, capacity=1000, recent=10)
+    assert not any(dedup.seen(key) for key in range(1000))
+    assert len(dedup.recent) == 10
+    assert all(dedup.seen(key) for key in range(1000))
+
+
+def test_bloom_filter_error_rate_and_memory_cap():
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for key in range(10_000):
+        bloom.add(str(key).encode())
+    assert all(bloom.add(str(key).encode()) for key in range(10_000))
+    false_positives = sum(str(key).encode() in bloom for key in range(10_000, 20_000))
+    assert false_positives < 300
+    assert BloomFilter(10_000_000, error_rate=0.001, max_bytes=1024).nbytes == 1024
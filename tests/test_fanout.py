@@ -0,0 +1,140 @@
+import threading
+import time
+
+from pytest import raises
+
+from src.inquestor.fanout import IngestSpec, ingest_many
+
+
+def single_page(url):
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": url}
+        return False
+
+    return next_page
+
+
+def paged(url, pages):
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": url, "params": {"page": 0}}
+        page = keyword_arg_dict["params"]["page"] + 1
+        return {"params": {"page": page}} if page < pages else False
+
+    return next_page
+
+
+def test_ingest_many_ordered(stub_server):
+    for feed in range(5):
+        for page in range(3):
+            stub_server.add(
+                f"/feed/{feed}",
+                json={"feed": feed, "page": page},
+                params={"page": page},
+            )
+    specs = [
+        IngestSpec(
+            "GET",
+            f"{stub_server.url}/feed/{feed}",
+            kwargs={"next_page": paged(f"{stub_server.url}/feed/{feed}", 3)},
+            source=feed,
+        )
+        for feed in range(5)
+    ]
+    results = list(ingest_many(specs, concurrency=3, ordered=True))
+    assert [(source, page["page"]) for source, page in results] == [
+        (feed, page) for feed in range(5) for page in range(3)
+    ]
+    assert all(source == page["feed"] for source, page in results)
+
+
+def test_ingest_many_per_host_limit(mocker):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+    request = mocker.patch("requests.Session.request")
+
+    def slow_request(method, url, **kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        response = mocker.Mock(status_code=200)
+        response.json.return_value = {"feed": url}
+        return response
+
+    request.side_effect = slow_request
+    specs = [
+        IngestSpec(
+            "GET",
+            f"https://api.test/feed/{feed}",
+            kwargs={"next_page": single_page(f"https://api.test/feed/{feed}")},
+        )
+        for feed in range(8)
+    ]
+    results = list(ingest_many(specs, concurrency=8, per_host=2))
+    assert sorted(source for source, _page in results) == sorted(
+        spec.source for spec in specs
+    )
+    assert peak == 2
+
+
+def test_ingest_many_raises_feed_error(stub_server):
+    specs = [IngestSpec("GET", stub_server.url, kwargs={"next_page": "not a function"})]
+    with raises(TypeError):
+        list(ingest_many(specs))
+
+
+def test_ingest_many_ordered_buffer_bounds_later_feeds(stub_server):
+    for feed in range(3):
+        for page in range(10):
+            stub_server.add(
+                f"/feed/{feed}",
+                json={"feed": feed, "page": page},
+                params={"page": page},
+            )
+
+    def slow(next_page):
+        def slow_next_page(keyword_arg_dict=None, response=None):
+            time.sleep(0.03)
+            return next_page(keyword_arg_dict, response)
+
+        return slow_next_page
+
+    specs = [
+        IngestSpec(
+            "GET",
+            f"{stub_server.url}/feed/{feed}",
+            kwargs={"next_page": paged(f"{stub_server.url}/feed/{feed}", 10)},
+        )
+        for feed in range(3)
+    ]
+    specs[0].kwargs["next_page"] = slow(specs[0].kwargs["next_page"])
+    results = ingest_many(specs, concurrency=3, ordered=True, buffer=3)
+    first_feed = [next(results).page["page"] for _page in range(10)]
+    assert first_feed == list(range(10))
+    # Each later feed holds one queued page and one waiting to be queued.
+    fetched = [path for path, _params, _headers in stub_server.requests]
+    assert fetched.count("/feed/1") <= 2
+    assert fetched.count("/feed/2") <= 2
+    assert len(list(results)) == 20
+
+
+def test_ingest_many_feeds_do_not_share_cookies(stub_server):
+    stub_server.add("/a", json={"feed": "a"}, headers={"Set-Cookie": "tenant=a"})
+    stub_server.add("/b", json={"feed": "b"})
+    specs = [
+        IngestSpec(
+            "GET",
+            f"{stub_server.url}/{feed}",
+            kwargs={"next_page": single_page(f"{stub_server.url}/{feed}")},
+        )
+        for feed in "ab"
+    ]
+    results = list(ingest_many(specs, concurrency=1, ordered=True))
+    assert [page["feed"] for _source, page in results] == ["a", "b"]
+    assert "Cookie" not in stub_server.requests[1][2]
@@ -0,0 +1,72 @@
+import logging
+
+import responses
+from pytest import mark
+
+from src.inquestor.inquestor import ingest
+from src.inquestor.instrument import LoggingSubscriber, MetricsRegistry
+from tests.conftest import add_pages, page_counter
+
+next_page = page_counter(3)
+
+
+def authenticate(reauth_dict=None, response=None):
+    return {"headers": {"Authorization": "Bearer token"}}, reauth_dict
+
+
+@mark.parametrize("prefetch", [0, 2])
+@responses.activate
+def test_page_events(prefetch):
+    add_pages(range(3))
+    events = []
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        authenticate=authenticate,
+        prefetch=prefetch,
+        instrument=events.append,
+    )
+    assert list(data) == [{"page": 0}, {"page": 1}, {"page": 2}]
+    assert [event.status for event in events] == [200, 200, 200]
+    assert all(event.bytes == len(b'{"page": 0}') for event in events)
+    assert all(event.latency >= 0 and event.decode >= 0 for event in events)
+    assert "next_page" in events[0].hooks
+    assert "authenticate" in events[0].hooks
+
+
+@responses.activate
+def test_metrics_registry_counts_statuses():
+    add_pages(range(3), failing=2)
+    registry = MetricsRegistry()
+    events = []
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        instrument=[registry, events.append],
+    )
+    assert list(data) == [{"page": 0}, {"page": 1}]
+    assert len(events) == 3
+    assert registry.pages == 3
+    assert registry.statuses == {200: 2, 500: 1}
+    text = registry.render()
+    assert 'inquestor_responses_total{status="500"} 1' in text
+    assert "inquestor_latency_seconds_count 3" in text
+    assert 'inquestor_hook_seconds_bucket{hook="next_page",le="+Inf"} 3' in text
+
+
+@responses.activate
+def test_logging_subscriber(caplog):
+    add_pages(range(3))
+    with caplog.at_level(logging.DEBUG, logger="inquestor"):
+        list(
+            ingest(
+                "GET",
+                "https://api.test",
+                next_page=next_page,
+                instrument=LoggingSubscriber(),
+            )
+        )
+    assert len(caplog.records) == 3
+    assert caplog.records[0].getMessage().startswith("200 https://api.test/?page=0")
@@ -0,0 +1,77 @@
+import threading
+
+import responses
+from pytest import raises
+from requests import ConnectionError
+from responses import matchers
+
+from src.inquestor.checkpoint import FileCheckpoint
+from src.inquestor.inquestor import ingest, lookahead_pages
+
+
+def next_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"cursor": 0}}
+    cursor = response.json()["next"]
+    return {"params": {"cursor": cursor}} if cursor is not None else False
+
+
+def add_page(cursor, next_cursor, status=200):
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        json={"cursor": cursor, "next": next_cursor},
+        status=status,
+        match=[matchers.query_param_matcher({"cursor": cursor})],
+    )
+
+
+@responses.activate
+def test_pages_keep_their_order():
+    for cursor in range(5):
+        add_page(cursor, cursor + 1 if cursor < 4 else None)
+    data = ingest("GET", "https://api.test", next_page=next_page, lookahead=2)
+    assert [page["cursor"] for page in data] == [0, 1, 2, 3, 4]
+
+
+@responses.activate
+def test_producer_errors_are_raised_in_the_consumer():
+    add_page(0, 1)
+    data = ingest("GET", "https://api.test", next_page=next_page, lookahead=2)
+    assert next(data)["cursor"] == 0
+    with raises(ConnectionError):
+        next(data)
+
+
+def test_close_stops_the_producer():
+    closed = threading.Event()
+
+    def endless():
+        try:
+            page = 0
+            while True:
+                yield page
+                page += 1
+        finally:
+            closed.set()
+
+    pages = lookahead_pages(endless(), 3)
+    assert [next(pages) for _ in range(5)] == [0, 1, 2, 3, 4]
+    pages.close()
+    assert closed.is_set()
+    assert not any(
+        thread.name == "inquestor-lookahead" for thread in threading.enumerate()
+    )
+
+
+def test_checkpoint_is_rejected(tmp_path):
+    with raises(ValueError):
+        next(
+            ingest(
+                "GET",
+                "https://api.test",
+                next_page=next_page,
+                lookahead=2,
+                checkpoint=FileCheckpoint(tmp_path / "checkpoint.json"),
+            )
+        )
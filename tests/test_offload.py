@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import responses
+from pytest import raises
+
+from src.inquestor.checkpoint import FileCheckpoint
+from src.inquestor.inquestor import ingest
+from tests.conftest import add_pages, page_counter
+
+next_page = page_counter()
+
+
+def items_until(count):
+    """Three items per page, the pages from ``count`` on are empty."""
+    return lambda page: {
+        "items": list(range(page * 3, page * 3 + 3)) if page < count else []
+    }
+
+
+def double(records):
+    return [record * 2 for record in records]
+
+
+@responses.activate
+def test_pages_are_decoded_in_processes_in_order():
+    # Decoding ahead fetches a few pages beyond the first empty one.
+    add_pages(range(6 + 8), items_until(6))
+    records = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        prefetch=2,
+        records="items[*]",
+        transform=double,
+        decode_processes=2,
+    )
+    assert list(records) == [record * 2 for record in range(18)]
+
+
+@responses.activate
+def test_shared_executor():
+    add_pages(range(2 + 2 * os.cpu_count()), items_until(2))
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+        pages = ingest(
+            "GET",
+            "https://api.test",
+            next_page=next_page,
+            prefetch=1,
+            records="items[*]",
+            batch_size=4,
+            decode_processes=executor,
+        )
+        assert list(pages) == [[0, 1, 2, 3], [4, 5]]
+
+
+@responses.activate
+def test_transform_without_processes():
+    add_pages(range(1 + 8), items_until(1))
+    records = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        prefetch=1,
+        records="items[*]",
+        transform=double,
+    )
+    assert list(records) == [0, 2, 4]
+
+
+def test_decode_processes_without_checkpoint(tmp_path):
+    with raises(ValueError):
+        next(
+            ingest(
+                "GET",
+                "https://api.test",
+                checkpoint=FileCheckpoint(tmp_path / "checkpoint.json"),
+                decode_processes=2,
+            )
+        )
@@ -0,0 +1,167 @@
+import json
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlsplit
+
+import responses
+from pytest import raises
+
+from src.inquestor.partition import Shard, ingest_partitioned, split_range
+
+
+def next_cursor(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"after": None}}
+    after = response.json()["next"]
+    return after is not None and {"params": {"after": after}}
+
+
+def partition(low, high):
+    return {"params": {"since": low, "until": high}}
+
+
+def cursor_api(request):
+    params = dict(parse_qsl(urlsplit(request.url).query))
+    since, until = int(params["since"]), int(params["until"])
+    start = int(params.get("after", since))
+    items = list(range(start, min(start + 10, until)))
+    after = start + 10 if start + 10 < until else None
+    return 200, {}, json.dumps({"items": items, "next": after})
+
+
+def test_split_range():
+    assert split_range(0, 10, 3) == [Shard(0, 3), Shard(3, 6), Shard(6, 10)]
+    assert split_range(0, 2, 4) == [Shard(0, 1), Shard(1, 2)]
+    start = datetime(2024, 1, 1)
+    assert split_range(start, start + timedelta(days=2), 2) == [
+        Shard(start, start + timedelta(days=1)),
+        Shard(start + timedelta(days=1), start + timedelta(days=2)),
+    ]
+
+
+@responses.activate
+def test_shards_cover_the_range():
+    responses.add_callback(responses.GET, "https://api.test", callback=cursor_api)
+    results = list(
+        ingest_partitioned(
+            "GET",
+            "https://api.test",
+            0,
+            100,
+            partition,
+            workers=2,
+            next_page=next_cursor,
+        )
+    )
+    assert len({result.source for result in results}) == 8
+    items = [item for result in results for item in result.page["items"]]
+    assert sorted(items) == list(range(100))
+
+
+@responses.activate
+def test_partition_params_are_merged():
+    responses.add_callback(responses.GET, "https://api.test", callback=cursor_api)
+    params = {"limit": 10}
+    results = list(
+        ingest_partitioned(
+            "GET",
+            "https://api.test",
+            0,
+            20,
+            partition,
+            workers=2,
+            shards=2,
+            params=params,
+            next_page=next_cursor,
+        )
+    )
+    assert len(results) == 2
+    for call in responses.calls:
+        query = dict(parse_qsl(urlsplit(call.request.url).query))
+        assert query["limit"] == "10" and "since" in query
+    assert params == {"limit": 10}
+
+
+@responses.activate
+def test_shard_pages_are_streamed():
+    responses.add_callback(responses.GET, "https://api.test", callback=cursor_api)
+    results = ingest_partitioned(
+        "GET",
+        "https://api.test",
+        0,
+        1000,
+        partition,
+        workers=1,
+        shards=1,
+        buffer=1,
+        next_page=next_cursor,
+    )
+    assert next(results).page["items"] == list(range(10))
+    results.close()
+    assert len(responses.calls) < 10
+
+
+@responses.activate
+def test_large_shards_are_split():
+    responses.add_callback(responses.GET, "https://api.test", callback=cursor_api)
+    results = list(
+        ingest_partitioned(
+            "GET",
+            "https://api.test",
+            0,
+            100,
+            partition,
+            workers=3,
+            shards=1,
+            split_after=2,
+            position=lambda page: page["items"][-1] + 1,
+            next_page=next_cursor,
+        )
+    )
+    items = [item for result in results for item in result.page["items"]]
+    assert sorted(items) == list(range(100))
+    assert Shard(0, 20) in {result.source for result in results}
+
+
+def test_process_pool(stub_server):
+    for low in (0, 2):
+        stub_server.add(
+            "/items",
+            {"items": [low, low + 1], "next": None},
+            params={"since": low, "until": low + 2},
+        )
+    results = ingest_partitioned(
+        "GET",
+        f"{stub_server.url}/items",
+        0,
+        4,
+        partition,
+        workers=2,
+        shards=2,
+        processes=True,
+        next_page=next_cursor,
+    )
+    pages = sorted((result.source, result.page["items"]) for result in results)
+    assert pages == [(Shard(0, 2), [0, 1]), (Shard(2, 4), [2, 3])]
+
+
+@responses.activate
+def test_shard_errors_are_raised():
+    responses.add_callback(responses.GET, "https://api.test", callback=cursor_api)
+
+    def failing_next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"params": {"after": None}}
+        raise ValueError("bad page")
+
+    results = ingest_partitioned(
+        "GET",
+        "https://api.test",
+        0,
+        100,
+        partition,
+        workers=2,
+        buffer=1,
+        next_page=failing_next_page,
+    )
+    with raises(ValueError):
+        list(results)
@@ -0,0 +1,111 @@
+import time
+
+import responses
+from pytest import mark, raises
+from requests import HTTPError
+from responses import matchers
+
+from src.inquestor.inquestor import ingest
+from src.inquestor.policy import Action, ErrorPolicy
+from tests.conftest import add_pages, page_counter
+
+next_page = page_counter(3)
+
+
+@mark.parametrize("prefetch", [0, 2])
+@responses.activate
+def test_failed_page_is_retried_in_place(prefetch):
+    add_pages([0])
+    add_pages([1], status=503)
+    add_pages([1], status=429, headers={"Retry-After": "7"})
+    add_pages([1])
+    add_pages([2], status=202)
+    delays = []
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        prefetch=prefetch,
+        errors=ErrorPolicy(backoff=1.0, sleep=delays.append),
+    )
+    assert list(data) == [{"page": 0}, {"page": 1}, {"page": 2}]
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 1.0
+    assert delays[1] == 7
+
+
+@mark.parametrize("prefetch", [0, 2])
+@responses.activate
+def test_retries_are_reported_in_page_events(prefetch):
+    add_pages([0])
+    add_pages([1], status=503)
+    add_pages([1])
+    add_pages([2])
+    events = []
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        prefetch=prefetch,
+        errors=ErrorPolicy(sleep=lambda delay: time.sleep(0.05)),
+        instrument=events.append,
+    )
+    assert len(list(data)) == 3
+    assert [event.retries for event in events] == [0, 1, 0]
+    assert events[1].latency >= 0.05
+
+
+@mark.parametrize("stream", [False, True])
+@mark.parametrize("prefetch", [0, 2])
+@responses.activate
+def test_empty_accepted_page_ends_stream(prefetch, stream):
+    add_pages([0])
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        body=b"",
+        status=204,
+        match=[matchers.query_param_matcher({"page": 1})],
+    )
+    add_pages([2])
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        prefetch=prefetch,
+        stream=stream,
+        errors=ErrorPolicy(sleep=lambda delay: None),
+    )
+    assert list(data) == [{"page": 0}]
+
+
+@responses.activate
+def test_exhausted_retries_raise():
+    add_pages([0], status=500)
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        errors=ErrorPolicy(max_attempts=3, sleep=lambda delay: None),
+    )
+    with raises(HTTPError):
+        list(data)
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_status_actions():
+    add_pages([0])
+    add_pages([1], status=404)
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        errors=ErrorPolicy({404: "stop"}),
+    )
+    assert list(data) == [{"page": 0}]
+    policy = ErrorPolicy({404: "raise", 503: Action.stop})
+    assert policy.action(404) is Action.raise_
+    assert policy.action(503) is Action.stop
+    assert policy.action(204) is Action.accept
+    assert policy.action(400) is Action.stop
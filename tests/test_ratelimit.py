@@ -0,0 +1,142 @@
+import multiprocessing
+import pickle
+import threading
+
+import responses
+from pytest import approx, raises
+from requests import Response
+
+from src.inquestor.inquestor import ingest
+from src.inquestor.ratelimit import RateLimiter, SharedRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_response(url="https://api.test/items", **headers):
+    response = Response()
+    response.url = url
+    response.headers.update(headers)
+    return response
+
+
+def test_token_bucket_burst_and_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2, burst=3, clock=clock)
+    assert [limiter.reserve("https://api.test") for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve("https://api.test") == approx(0.5)
+    assert limiter.reserve("https://api.test") == approx(1.0)
+    assert limiter.reserve("https://other.test") == 0
+    clock.now = 10
+    assert limiter.reserve("https://api.test") == 0
+    with raises(ValueError):
+        RateLimiter(rate=0)
+
+
+def test_shared_bucket():
+    limiter = RateLimiter(rate=1, burst=1, per_host=False, clock=FakeClock())
+    assert limiter.reserve("https://api.test") == 0
+    assert limiter.reserve("https://other.test") == approx(1.0)
+
+
+def test_retry_after_blocks_host():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, burst=5, clock=clock)
+    limiter.update(make_response(**{"Retry-After": "3"}))
+    assert limiter.reserve("https://api.test/items") == approx(3.0)
+    assert limiter.reserve("https://other.test") == 0
+
+
+def test_rate_limit_headers():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=100, burst=10, clock=clock)
+    limiter.update(
+        make_response(**{"X-RateLimit-Remaining": "4", "X-RateLimit-Reset": "2"})
+    )
+    delays = [limiter.reserve("https://api.test") for _ in range(6)]
+    assert delays[:4] == [0, 0, 0, 0]
+    assert delays[4] == approx(0.5)
+    limiter.update(
+        make_response(**{"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "30"})
+    )
+    assert limiter.reserve("https://api.test") >= 30
+
+
+def test_thread_safe_reservations():
+    limiter = RateLimiter(rate=1000, burst=1, clock=FakeClock())
+    delays = []
+
+    def reserve():
+        for _ in range(100):
+            delays.append(limiter.reserve("https://api.test"))
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(delays) == approx([i / 1000 for i in range(800)])
+
+
+@responses.activate
+def test_ingest_rate_limiter(mocker):
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        json={"data": "response1"},
+        headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"},
+    )
+    responses.add(responses.GET, "https://api.test2", json={"data": "response2"})
+    mock_sleep = mocker.patch("time.sleep", return_value=None)
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"url": "https://api.test"}
+        if keyword_arg_dict["url"] == "https://api.test":
+            return {"url": "https://api.test2"}
+        return False
+
+    limiter = RateLimiter(rate=100, per_host=False, clock=FakeClock())
+    data = ingest(
+        method="GET", url="https://api.test", next_page=next_page, rate_limit=limiter
+    )
+    assert [item["data"] for item in data] == ["response1", "response2"]
+    mock_sleep.assert_called_once()
+    assert mock_sleep.call_args.args[0] == approx(5.0)
+
+
+def frozen_clock():
+    return 0.0
+
+
+def reserve_many(limiter, count):
+    return [limiter.reserve("https://api.test") for _ in range(count)]
+
+
+def test_shared_limiter_spans_instances(tmp_path):
+    path = tmp_path / "ratelimit"
+    first = SharedRateLimiter(path, rate=10, burst=2, clock=frozen_clock)
+    second = pickle.loads(pickle.dumps(first))
+    assert first.reserve("https://api.test") == 0
+    assert second.reserve("https://api.test") == 0
+    assert first.reserve("https://api.test") == approx(0.1)
+    assert second.reserve("https://other.test") == 0
+    second.update(make_response(**{"Retry-After": "3"}))
+    assert first.reserve("https://api.test/items") == approx(3.0)
+    first.close()
+    second.close()
+
+
+def test_shared_limiter_across_processes(tmp_path):
+    limiter = SharedRateLimiter(tmp_path / "ratelimit", rate=100, clock=frozen_clock)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(4) as pool:
+        results = pool.starmap(reserve_many, [(limiter, 25)] * 4)
+    delays = sorted(delay for result in results for delay in result)
+    assert delays == approx([i / 100 for i in range(100)])
+    limiter.close()
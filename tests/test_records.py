@@ -0,0 +1,134 @@
+import json
+import tracemalloc
+
+import responses
+from pytest import mark, raises
+
+from src.inquestor.budget import MemoryBudget
+from src.inquestor.inquestor import ingest
+from src.inquestor.records import extract_records, iter_records, parse_path
+
+page = {
+    "meta": {"skip": [1, {"a": "b]}\\"}], "text": 'quote " and \\u00e9 and \\\\'},
+    "data": {
+        "count": 3,
+        "items": [
+            {"id": 1, "name": "é", "tags": ["x", "y"]},
+            {"id": 2, "name": "bracket ] and brace }", "nested": {"items": [9]}},
+            {"id": 3, "name": None, "value": -1.5e3, "ok": True},
+        ],
+    },
+    "items": [{"id": "wrong"}],
+}
+
+
+def chunked(data: bytes, size: int):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 10_000])
+@mark.parametrize(
+    "path", ["data.items[*]", "data.items[*].name", "data.count", "items[*]", "nope"]
+)
+def test_iter_records_matches_extract_records(chunk_size, path):
+    body = json.dumps(page, ensure_ascii=False, indent=1).encode()
+    streamed = list(iter_records(chunked(body, chunk_size), path))
+    assert streamed == extract_records(page, path)
+
+
+def test_iter_records_top_level_array():
+    assert list(iter_records([b" [1, ", b'"two", [3]] '], "[*]")) == [1, "two", [3]]
+    assert list(iter_records([b"[]"], "[*]")) == []
+    assert list(iter_records([b""], "[*]")) == []
+
+
+def test_parse_path():
+    assert parse_path("data.items[*]") == ("data", "items", None)
+    with raises(ValueError):
+        parse_path("data.items[0]")
+
+
+def test_iter_records_bounded_memory():
+    record = {"id": 0, "payload": "x" * 100}
+    count = 20_000
+
+    def body():
+        yield b'{"data": {"items": ['
+        for i in range(count):
+            yield (b"," if i else b"") + json.dumps(record).encode()
+        yield b"]}}"
+
+    tracemalloc.start()
+    seen = sum(1 for _record in iter_records(body(), "data.items[*]"))
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert seen == count
+    assert peak < 1_000_000
+
+
+@responses.activate
+@mark.parametrize("stream", [False, True])
+def test_ingest_records(stream):
+    for i in range(2):
+        responses.add(
+            responses.GET,
+            "https://api.test",
+            json={"data": {"items": [{"id": 2 * i}, {"id": 2 * i + 1}]}},
+            match=[responses.matchers.query_param_matcher({"page": i})],
+        )
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"params": {"page": 0}}
+        page = keyword_arg_dict["params"]["page"] + 1
+        return {"params": {"page": page}} if page < 2 else False
+
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        records="data.items[*]",
+        stream=stream,
+    )
+    assert [record["id"] for record in data] == [0, 1, 2, 3]
+
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        records="data.items[*]",
+        stream=stream,
+        batch_size=3,
+    )
+    assert [[record["id"] for record in batch] for batch in data] == [[0, 1, 2], [3]]
+
+
+@responses.activate
+def test_prefetched_records_are_streamed():
+    for i in range(2):
+        responses.add(
+            responses.GET,
+            "https://api.test",
+            json={"data": {"items": [{"id": i, "padding": "x" * 1000}]}},
+            match=[responses.matchers.query_param_matcher({"page": i})],
+        )
+
+    def next_page(keyword_arg_dict=None, response=None):
+        if keyword_arg_dict is None:
+            return {"params": {"page": 0}}
+        page = keyword_arg_dict["params"]["page"] + 1
+        return {"params": {"page": page}} if page < 2 else False
+
+    budget = MemoryBudget(10**9)
+    data = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        records="data.items[*]",
+        stream=True,
+        prefetch=1,
+        budget=budget,
+    )
+    assert [record["id"] for record in data] == [0, 1]
+    # Counted once while the records stream, not again for a full read.
+    assert budget.peak < 1500
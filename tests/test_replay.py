@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+import responses
+from pytest import raises
+from requests import ConnectionError, Request, Response
+from responses import matchers
+
+from src.inquestor.inquestor import ingest
+from src.inquestor.replay import (
+    Archive,
+    ReplayAdapter,
+    record_session,
+    replay_session,
+)
+
+
+def next_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"cursor": 0}}
+    cursor = response.json()["next"]
+    return {"params": {"cursor": cursor}} if cursor is not None else False
+
+
+def counted_next_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"cursor": 0}}
+    cursor = keyword_arg_dict["params"]["cursor"] + 1
+    return {"params": {"cursor": cursor}} if cursor < 3 else False
+
+
+def run(session, stream=False):
+    with session:
+        return list(
+            ingest(
+                "GET",
+                "https://api.test",
+                # A streamed body is consumed before next_page runs.
+                next_page=counted_next_page if stream else next_page,
+                records="items[*]",
+                session=session,
+                stream=stream,
+            )
+        )
+
+
+def test_recorded_pages_replay_offline(tmp_path):
+    with responses.RequestsMock() as mock:
+        for cursor in range(3):
+            mock.add(
+                responses.GET,
+                "https://api.test",
+                json={"items": [cursor], "next": cursor + 1 if cursor < 2 else None},
+                match=[matchers.query_param_matcher({"cursor": cursor})],
+            )
+        recorded = run(record_session(tmp_path / "archive"))
+    assert recorded == [0, 1, 2]
+    assert run(replay_session(tmp_path / "archive")) == recorded
+    assert run(replay_session(tmp_path / "archive"), stream=True) == recorded
+
+
+def fake_response(body, seconds=0.0):
+    response = Response()
+    response.status_code = 200
+    response._content = body
+    response.elapsed = timedelta(seconds=seconds)
+    return response
+
+
+def test_replay_order_latency_and_misses(tmp_path, mocker):
+    sleep = mocker.patch("time.sleep")
+    archive = Archive(tmp_path / "archive")
+    request = Request("GET", "https://api.test/poll").prepare()
+    archive.append(request, fake_response(b"first", 0.25))
+    archive.append(request, fake_response(b"second"))
+
+    adapter = ReplayAdapter(archive, latency=True)
+    assert [adapter.send(request).content for _ in range(3)] == [
+        b"first",
+        b"second",
+        b"second",
+    ]
+    assert sleep.call_args_list[0].args == (0.25,)
+    request.url = "https://api.test/other"
+    with raises(ConnectionError):
+        adapter.send(request)
+    adapter.close()
+    archive.close()
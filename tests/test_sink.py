@@ -0,0 +1,85 @@
+import gzip
+import json
+import threading
+from pathlib import Path
+
+import responses
+from pytest import raises
+
+from src.inquestor.sink import ByteQueue, CSVSink, NDJSONSink, ingest_to
+from tests.conftest import add_pages, page_counter
+
+next_page = page_counter(3)
+
+
+def items(page):
+    return {"items": [{"id": page * 2 + i, "name": f"n{i}"} for i in range(2)]}
+
+
+@responses.activate
+def test_ndjson_sink_rotates_gzip_files(tmp_path):
+    add_pages(range(3), items)
+    sink = NDJSONSink(tmp_path / "out-{index}.ndjson.gz", rotate_bytes=40)
+    files = ingest_to(
+        sink,
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        records="items[*]",
+        batch_size=2,
+    )
+    assert len(files) == 3
+    lines = [
+        line
+        for path in files
+        for line in gzip.decompress(Path(path).read_bytes()).splitlines()
+    ]
+    assert [json.loads(line)["id"] for line in lines] == list(range(6))
+    assert sink.records == 6
+
+
+@responses.activate
+def test_csv_sink_writes_header_and_fields(tmp_path):
+    add_pages(range(3), items)
+    files = ingest_to(
+        CSVSink(tmp_path / "out.csv", fields=["id", "missing"]),
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        records="items[*]",
+    )
+    assert (tmp_path / "out.csv").read_text().splitlines() == [
+        "id,missing",
+        *[f"{i}," for i in range(6)],
+    ]
+    assert files == [str(tmp_path / "out.csv")]
+
+
+@responses.activate
+def test_writer_errors_are_raised(tmp_path):
+    add_pages(range(3), items)
+
+    class FailingSink(NDJSONSink):
+        def write(self, chunk):
+            raise OSError("disk full")
+
+    with raises(OSError, match="disk full"):
+        ingest_to(
+            FailingSink(tmp_path / "out.ndjson"),
+            "GET",
+            "https://api.test",
+            next_page=next_page,
+        )
+
+
+def test_byte_queue_blocks_above_max_bytes():
+    queue = ByteQueue(max_bytes=10)
+    queue.put(b"x" * 8)
+    put = threading.Thread(target=queue.put, args=(b"y" * 8,))
+    put.start()
+    put.join(0.1)
+    assert put.is_alive()
+    assert queue.get() == b"x" * 8
+    put.join(1)
+    assert not put.is_alive()
+    assert queue.pending == 8
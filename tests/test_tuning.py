@@ -0,0 +1,108 @@
+import io
+import json
+import time
+from datetime import timedelta
+from functools import partial
+from urllib.parse import parse_qsl, urlsplit
+
+import responses
+from requests import PreparedRequest, Response
+
+from src.inquestor.budget import MemoryBudget
+from src.inquestor.inquestor import ingest
+from src.inquestor.tuning import PageSizeTuner
+
+
+def fake_response(limit, seconds, status=200):
+    response = Response()
+    response.status_code = status
+    response.elapsed = timedelta(seconds=seconds)
+    response.request = PreparedRequest()
+    response.request.prepare(
+        method="GET", url="https://api.test", params={"limit": limit}
+    )
+    return response
+
+
+def test_size_grows_while_the_rate_improves_and_settles():
+    tuner = PageSizeTuner("limit", 10, 1000)
+    # 0.1s per request plus 1ms per record, and 10ms per record above 200.
+    for _page in range(30):
+        size = tuner.params({})["limit"]
+        tuner.observe(
+            fake_response(size, 0.1 + size * 0.001 + max(size - 200, 0) * 0.01)
+        )
+    assert 100 < tuner.size < 400
+
+
+def test_slow_responses_shrink_and_cap_the_size():
+    tuner = PageSizeTuner("limit", 10, 1000, initial=400, max_latency=1.0)
+    tuner.observe(fake_response(400, 2.0))
+    assert tuner.size == 200
+    assert tuner.ceiling == 399
+    for _page in range(20):
+        tuner.observe(fake_response(tuner.size, 0.01))
+    assert tuner.size <= 399
+
+
+def test_rate_is_measured_until_the_end_of_the_body():
+    tuner = PageSizeTuner("limit", 10, 1000)
+
+    def slow_send(request_input_args):
+        time.sleep(0.05)
+        return fake_response(100, 0.0), None
+
+    response, _ = tuner.send(slow_send, {})
+    assert response.body_seconds >= 0.05
+    tuner.observe(response)
+    assert tuner.best_rate <= 100 / 0.05
+
+
+def test_streamed_body_is_timed_through_the_budget():
+    tuner = PageSizeTuner("limit", 10, 1000)
+    budget = MemoryBudget(1024)
+
+    def stream_send(request_input_args):
+        response = fake_response(100, 0.0)
+        response.raw = io.BytesIO(b'{"items": []}')
+        return response, None
+
+    response, _ = tuner.send(partial(budget.send, stream_send), {"stream": True})
+    time.sleep(0.05)
+    assert not hasattr(response, "body_seconds")
+    assert b"".join(response.iter_content(4)) == b'{"items": []}'
+    assert response.body_seconds >= 0.05
+    assert budget.in_flight == len(b'{"items": []}')
+
+
+def offset_api(request):
+    params = dict(parse_qsl(urlsplit(request.url).query))
+    offset, limit = int(params["offset"]), int(params["limit"])
+    return 200, {}, json.dumps({"items": list(range(offset, min(offset + limit, 500)))})
+
+
+def next_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"offset": 0}}
+    if response is not None and not response.json()["items"]:
+        return False
+    return keyword_arg_dict
+
+
+@responses.activate
+def test_offsets_follow_the_page_sizes():
+    responses.add_callback(responses.GET, "https://api.test", callback=offset_api)
+    records = ingest(
+        "GET",
+        "https://api.test",
+        next_page=next_page,
+        records="items[*]",
+        page_size=PageSizeTuner("limit", 10, 200, offset="offset"),
+    )
+    assert list(records) == list(range(500))
+    limits = [
+        int(dict(parse_qsl(urlsplit(call.request.url).query))["limit"])
+        for call in responses.calls
+    ]
+    assert limits[0] == 10
+    assert len(set(limits)) > 1
@@ -0,0 +1,79 @@
+import responses
+from responses import matchers
+
+from src.inquestor.inquestor import ingest
+from src.inquestor.watermark import FileWatermark, SQLiteWatermark
+
+
+def single_page(keyword_arg_dict=None, response=None):
+    if keyword_arg_dict is None:
+        return {"params": {"page": 0}}
+    return False
+
+
+def add_page(params, updated, status=200):
+    responses.add(
+        responses.GET,
+        "https://api.test",
+        json={"data": [{"id": i, "updated_at": at} for i, at in enumerate(updated)]},
+        status=status,
+        match=[matchers.query_param_matcher({"page": 0} | params)],
+    )
+
+
+def run(watermark):
+    return list(
+        ingest(
+            "GET",
+            "https://api.test",
+            next_page=single_page,
+            records="data[*]",
+            watermark=watermark,
+        )
+    )
+
+
+@responses.activate
+def test_watermark_advances_after_completed_runs(tmp_path):
+    add_page({}, ["2024-01-02", "2024-01-03", "2024-01-01"])
+    add_page({"updated_since": "2024-01-03"}, ["2024-01-05"], status=503)
+    watermark = FileWatermark(
+        tmp_path / "watermark.json", "updated_at", inject="updated_since"
+    )
+    assert len(run(watermark)) == 3
+    assert watermark.load() == "2024-01-03"
+    assert run(watermark) == []
+    assert watermark.load() == "2024-01-03"
+
+
+@responses.activate
+def test_watermark_is_not_stored_when_the_consumer_stops(tmp_path):
+    add_page({}, ["2024-01-02", "2024-01-03"])
+    watermark = FileWatermark(
+        tmp_path / "watermark.json", "updated_at", inject="updated_since"
+    )
+    records = ingest(
+        "GET",
+        "https://api.test",
+        next_page=single_page,
+        records="data[*]",
+        watermark=watermark,
+    )
+    next(records)
+    records.close()
+    assert watermark.load() is None
+
+
+@responses.activate
+def test_sqlite_watermark_keeps_the_last_value(tmp_path):
+    add_page({"since": 0}, ["b", "a"])
+    with SQLiteWatermark(
+        tmp_path / "state.db",
+        "feed",
+        lambda record: record["updated_at"],
+        inject=lambda value: {"params": {"since": value}},
+        keep="last",
+        initial=0,
+    ) as watermark:
+        assert len(run(watermark)) == 2
+        assert watermark.load() == "a"